@@ -4,11 +4,20 @@ Run with: streamlit run app.py
 """
 
 import streamlit as st
+import numpy as np
 import pandas as pd
+import uuid
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
-from src.parser import UPSInvoiceParser, load_invoices_from_folder
+from src.parser import (
+    InvoiceCache,
+    UPSInvoiceParser,
+    _max_workers,
+    combine_invoices,
+    load_invoices_from_folder,
+)
 from src.analyzer import InvoiceAnalyzer
 from src.visualizations import (
     create_cost_breakdown_pie,
@@ -59,29 +68,21 @@ st.markdown(
         padding: 15px;
         border-left: 4px solid #351C15;
     }
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 8px;
-    }
-    .stTabs [data-baseweb="tab"] {
-        background-color: #E8DCD0;
-        border-radius: 5px 5px 0 0;
-        color: #351C15 !important;
-        font-weight: 500;
-    }
-    .stTabs [data-baseweb="tab"]:hover {
-        background-color: #D4C4B0;
-    }
-    .stTabs [aria-selected="true"] {
-        background-color: #351C15 !important;
-        color: white !important;
-        font-weight: 600;
-    }
 </style>
 """,
     unsafe_allow_html=True,
 )
 
 
+# Table column formats, applied by the dataframe widget rather than per cell
+# in Python (a pandas Styler formats every cell before serializing)
+DATE_COLUMN = st.column_config.DateColumn(format="YYYY-MM-DD")
+MONEY_COLUMN = st.column_config.NumberColumn(format="accounting")
+COUNT_COLUMN = st.column_config.NumberColumn(format="localized")
+WEIGHT_COLUMN = st.column_config.NumberColumn(format="%.1f")
+PERCENT_COLUMN = st.column_config.NumberColumn(format="%.1f%%")
+
+
 def main():
     """Main application entry point."""
     # Header
@@ -132,75 +133,130 @@ def main():
         # Filters (only show if data is loaded)
         if st.session_state.analyzer is not None:
             st.header("🔍 Filters")
-            filtered_analyzer = apply_filters(st.session_state.analyzer)
+            filtered_analyzer, filter_sig = apply_filters(st.session_state.analyzer)
         else:
-            filtered_analyzer = None
+            filtered_analyzer, filter_sig = None, None
 
         st.divider()
 
         # Export options
         if filtered_analyzer is not None:
             st.header("📥 Export")
-            export_pdf(filtered_analyzer)
+            export_pdf(filtered_analyzer, filter_sig)
 
     # Main content
     if filtered_analyzer is None:
         show_welcome_screen()
     else:
-        show_dashboard(filtered_analyzer)
+        show_dashboard(filtered_analyzer, filter_sig)
+
+
+def _parse_invoice(source, filename: str, cache: InvoiceCache | None) -> pd.DataFrame:
+    """Parse one invoice from an uploaded file or a cached path on disk."""
+    if isinstance(source, Path):
+        return cache.load(source)
+    return UPSInvoiceParser().parse_file(source, filename)
+
+
+def _source_descriptor(source, filename: str) -> tuple:
+    """Identify an input by name, size and mtime (or upload id)."""
+    if isinstance(source, Path):
+        stat = source.stat()
+        return (filename, stat.st_size, stat.st_mtime_ns)
+    return (filename, source.size, getattr(source, "file_id", None))
 
 
 def load_data(uploaded_files, use_folder: bool):
     """Load data from uploaded files or folder."""
-    parser = UPSInvoiceParser()
+    sources = []
+    cache = None
+
+    # Uploaded files take precedence over the invoices folder
+    if uploaded_files:
+        sources = [(file, file.name) for file in uploaded_files]
+    elif use_folder:
+        folder_path = Path("invoices")
+        if folder_path.exists():
+            sources = [(path, path.name) for path in folder_path.glob("*.csv")]
+            cache = InvoiceCache(folder_path)
+        else:
+            st.sidebar.warning("invoices/ folder not found")
+
+    # Nothing to do if exactly these inputs are already loaded
+    loaded_sig = tuple(_source_descriptor(source, name) for source, name in sources)
+    if (
+        sources
+        and st.session_state.data is not None
+        and st.session_state.get("loaded_sig") == loaded_sig
+    ):
+        st.sidebar.info("Data unchanged since last load")
+        return
+
     all_data = []
+    loaded = []
+    errors = []
 
     with st.spinner("Loading invoice data..."):
-        # Load uploaded files
-        if uploaded_files:
-            for file in uploaded_files:
-                try:
-                    df = parser.parse_file(file, file.name)
-                    all_data.append(df)
-                    st.sidebar.success(f"Loaded: {file.name}")
-                except Exception as e:
-                    st.sidebar.error(f"Error loading {file.name}: {e}")
-
-        # Load from folder
-        if use_folder and not uploaded_files:
-            folder_path = Path("invoices")
-            if folder_path.exists():
-                csv_files = list(folder_path.glob("*.csv"))
-                for csv_file in csv_files:
+        # Files are independent, so parse them concurrently. Results are
+        # collected in input order and reported from the main thread.
+        if sources:
+            with ThreadPoolExecutor(max_workers=_max_workers(len(sources))) as executor:
+                futures = [
+                    (name, executor.submit(_parse_invoice, source, name, cache))
+                    for source, name in sources
+                ]
+                for name, future in futures:
                     try:
-                        with open(csv_file, "rb") as f:
-                            df = parser.parse_file(f, csv_file.name)
-                            all_data.append(df)
+                        all_data.append(future.result())
+                        loaded.append(name)
                     except Exception as e:
-                        st.sidebar.error(f"Error loading {csv_file.name}: {e}")
+                        errors.append((name, e))
+        if cache is not None:
+            cache.save()
+
+    for name, e in errors:
+        st.sidebar.error(f"Error loading {name}: {e}")
 
-                if csv_files:
-                    st.sidebar.success(f"Loaded {len(csv_files)} files from invoices/")
-            else:
-                st.sidebar.warning("invoices/ folder not found")
+    if uploaded_files:
+        for name in loaded:
+            st.sidebar.success(f"Loaded: {name}")
+    elif sources:
+        st.sidebar.success(f"Loaded {len(sources)} files from invoices/")
 
     if all_data:
-        combined_data = pd.concat(all_data, ignore_index=True)
+        combined_data = combine_invoices(all_data)
         st.session_state.data = combined_data
+        # Fresh token per load: keys every cache derived from this dataset
+        st.session_state.data_key = uuid.uuid4().hex
+        st.session_state.loaded_sig = loaded_sig
         st.session_state.analyzer = InvoiceAnalyzer(combined_data)
         st.sidebar.success(f"✅ {len(combined_data):,} records loaded")
     else:
         st.sidebar.warning("No data loaded")
 
 
-def apply_filters(analyzer: InvoiceAnalyzer) -> InvoiceAnalyzer:
-    """Apply sidebar filters and return filtered analyzer."""
+@st.cache_data(show_spinner=False)
+def _country_options(data_key: str, _data: pd.DataFrame) -> list:
+    """Get the sorted destination countries of a loaded dataset.
+
+    Cached on the dataset's load token so widget interactions don't rescan
+    the data.
+    """
+    return np.sort(_data["recipient_country"].dropna().unique()).tolist()
+
+
+def apply_filters(analyzer: InvoiceAnalyzer) -> tuple[InvoiceAnalyzer, tuple]:
+    """Apply sidebar filters.
+
+    Returns:
+        Tuple of (filtered analyzer, filter signature used as a cache key)
+    """
     data = analyzer.data
 
     # Date range filter
-    if data["shipment_date"].notna().any():
-        min_date = data["shipment_date"].min().date()
-        max_date = data["shipment_date"].max().date()
+    if analyzer.date_min is not None:
+        min_date = analyzer.date_min.date()
+        max_date = analyzer.date_max.date()
 
         date_range = st.date_input(
             "Date Range",
@@ -216,8 +272,11 @@ def apply_filters(analyzer: InvoiceAnalyzer) -> InvoiceAnalyzer:
     else:
         start_date, end_date = None, None
 
+    countries = _country_options(st.session_state.data_key, data)
+    # Memoized on the session's analyzer, so this is computed once per load
+    service_names = analyzer.service_names
+
     # Country filter (use recipient_country since this is outbound data)
-    countries = sorted(data["recipient_country"].dropna().unique().tolist())
     selected_countries = st.multiselect(
         "Destination Countries",
         options=countries,
@@ -226,16 +285,8 @@ def apply_filters(analyzer: InvoiceAnalyzer) -> InvoiceAnalyzer:
     )
 
     # Service filter
-    services = sorted(data["service_code"].dropna().unique().tolist())
-    service_names = {
-        code: analyzer.data[analyzer.data["service_code"] == code]["service_name"].iloc[
-            0
-        ]
-        for code in services
-        if not analyzer.data[analyzer.data["service_code"] == code].empty
-    }
     service_options = [
-        f"{code} - {service_names.get(code, 'Unknown')}" for code in services
+        f"{code} - {service_names.get(code, 'Unknown')}" for code in service_names
     ]
 
     selected_services_display = st.multiselect(
@@ -254,22 +305,48 @@ def apply_filters(analyzer: InvoiceAnalyzer) -> InvoiceAnalyzer:
     returns_only = st.checkbox("Returns only", value=False)
 
     # Apply filters
-    return analyzer.filter_data(
-        start_date=str(start_date) if start_date else None,
-        end_date=str(end_date) if end_date else None,
-        countries=selected_countries if selected_countries else None,
-        services=selected_services,
-        returns_only=returns_only,
+    filters = {
+        "start_date": str(start_date) if start_date else None,
+        "end_date": str(end_date) if end_date else None,
+        "countries": selected_countries if selected_countries else None,
+        "services": selected_services,
+        "returns_only": returns_only,
+    }
+    sig = (
+        st.session_state.data_key,
+        filters["start_date"],
+        filters["end_date"],
+        tuple(filters["countries"] or ()),
+        tuple(filters["services"] or ()),
+        returns_only,
     )
+    return analyzer.filter_data(**filters), sig
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def cached_analysis(sig: tuple, method: str, _analyzer: InvoiceAnalyzer, **kwargs):
+    """Run an analyzer method, memoized on the filter signature.
+
+    The analyzer itself is not hashed; ``sig`` identifies the loaded dataset
+    and filters it was built from. Overview and the dedicated tabs request the
+    same analyses, so they share cache entries across reruns.
+    """
+    return getattr(_analyzer, method)(**kwargs)
+
 
+@st.cache_data(max_entries=8, show_spinner=False)
+def cached_pdf_report(sig: tuple, _analyzer: InvoiceAnalyzer) -> bytes:
+    """Generate the PDF report, memoized on the filter signature."""
+    return PDFReportGenerator().generate_report(_analyzer)
 
-def export_pdf(analyzer: InvoiceAnalyzer):
-    """Export PDF report."""
+
+@st.fragment
+def export_pdf(analyzer: InvoiceAnalyzer, sig: tuple):
+    """Export PDF report (a fragment, so its buttons don't rerun the dashboard)."""
     if st.button("📄 Generate PDF Report", width="stretch"):
         with st.spinner("Generating PDF..."):
             try:
-                generator = PDFReportGenerator()
-                pdf_bytes = generator.generate_report(analyzer)
+                pdf_bytes = cached_pdf_report(sig, analyzer)
 
                 st.download_button(
                     label="⬇️ Download PDF",
@@ -327,9 +404,14 @@ def show_welcome_screen():
         """)
 
 
-def show_dashboard(analyzer: InvoiceAnalyzer):
-    """Show the main dashboard with all analysis tabs."""
-    summary = analyzer.get_summary()
+@st.fragment
+def show_dashboard(analyzer: InvoiceAnalyzer, sig: tuple):
+    """Show the main dashboard with the selected analysis section.
+
+    Runs as a fragment: switching sections or using a section's own widgets
+    reruns only the dashboard, not data loading and the sidebar.
+    """
+    summary = cached_analysis(sig, "get_summary", analyzer)
     kpis = create_kpi_cards(summary)
 
     # KPI Row
@@ -350,89 +432,44 @@ def show_dashboard(analyzer: InvoiceAnalyzer):
 
     st.divider()
 
-    # Analysis Tabs
-    tabs = st.tabs(
-        [
-            "📊 Overview",
-            "💰 Cost Breakdown",
-            "🌍 Destinations",
-            "📈 Trends",
-            "↩️ Returns",
-            "⚖️ Weights",
-            "🚚 Services",
-            "📦 Duties & Brokerage",
-            "🏷️ Accessorials",
-            "🔝 Top Expenses",
-        ]
+    # Analysis sections - only the selected one is computed and rendered
+    section = st.radio(
+        "Section",
+        list(DASHBOARD_SECTIONS),
+        horizontal=True,
+        key="active_tab",
+        label_visibility="collapsed",
     )
+    DASHBOARD_SECTIONS[section](analyzer, summary, sig)
 
-    # Overview Tab
-    with tabs[0]:
-        show_overview_tab(analyzer, summary)
-
-    # Cost Breakdown Tab
-    with tabs[1]:
-        show_cost_breakdown_tab(analyzer, summary)
 
-    # Destinations Tab
-    with tabs[2]:
-        show_destinations_tab(analyzer, summary)
-
-    # Trends Tab
-    with tabs[3]:
-        show_trends_tab(analyzer, summary)
-
-    # Returns Tab
-    with tabs[4]:
-        show_returns_tab(analyzer)
-
-    # Weights Tab
-    with tabs[5]:
-        show_weights_tab(analyzer)
-
-    # Services Tab
-    with tabs[6]:
-        show_services_tab(analyzer, summary)
-
-    # Duties & Brokerage Tab
-    with tabs[7]:
-        show_duties_tab(analyzer, summary)
-
-    # Accessorials Tab
-    with tabs[8]:
-        show_accessorials_tab(analyzer, summary)
-
-    # Top Expenses Tab
-    with tabs[9]:
-        show_top_expenses_tab(analyzer, summary)
-
-
-def show_overview_tab(analyzer: InvoiceAnalyzer, summary):
+def show_overview_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show overview tab content."""
     col1, col2 = st.columns(2)
 
     with col1:
         st.subheader("Cost Distribution")
-        breakdown = analyzer.analyze_cost_breakdown()
+        breakdown = cached_analysis(sig, "analyze_cost_breakdown", analyzer)
         fig = create_cost_breakdown_pie(breakdown)
         st.plotly_chart(fig, key="overview_cost_pie", width="stretch")
 
     with col2:
         st.subheader("Top Destinations")
-        by_country = analyzer.analyze_by_destination()
+        by_country = cached_analysis(sig, "analyze_by_destination", analyzer)
         fig = create_destination_bar(by_country, top_n=10, currency=summary.currency)
         st.plotly_chart(fig, key="overview_dest_bar", width="stretch")
 
     # Trend chart full width
     st.subheader("Cost Trend")
-    trends = analyzer.analyze_trends(period="week")
+    # Same cache entry as the Trends section
+    trends = cached_analysis(sig, "analyze_trend_periods", analyzer)["week"]
     fig = create_trend_chart(trends, summary.currency)
     st.plotly_chart(fig, key="overview_trend", width="stretch")
 
 
-def show_cost_breakdown_tab(analyzer: InvoiceAnalyzer, summary):
+def show_cost_breakdown_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show cost breakdown tab content."""
-    breakdown = analyzer.analyze_cost_breakdown()
+    breakdown = cached_analysis(sig, "analyze_cost_breakdown", analyzer)
 
     col1, col2 = st.columns(2)
 
@@ -466,22 +503,21 @@ def show_cost_breakdown_tab(analyzer: InvoiceAnalyzer, summary):
             "% of Total",
         ]
         st.dataframe(
-            display_df.style.format(
-                {
-                    "Discount": "{:,.2f}",
-                    "Net Amount": "{:,.2f}",
-                    "Total": "{:,.2f}",
-                    "% of Total": "{:.1f}%",
-                }
-            ),
+            display_df,
+            column_config={
+                "Discount": MONEY_COLUMN,
+                "Net Amount": MONEY_COLUMN,
+                "Total": MONEY_COLUMN,
+                "% of Total": PERCENT_COLUMN,
+            },
             width="stretch",
             hide_index=True,
         )
 
 
-def show_destinations_tab(analyzer: InvoiceAnalyzer, summary):
+def show_destinations_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show destinations tab content."""
-    by_country = analyzer.analyze_by_destination()
+    by_country = cached_analysis(sig, "analyze_by_destination", analyzer)
 
     # Map
     st.subheader("Shipments by Destination Country")
@@ -517,28 +553,28 @@ def show_destinations_tab(analyzer: InvoiceAnalyzer, summary):
             "Return %",
         ]
         st.dataframe(
-            display_df.style.format(
-                {
-                    "Packages": "{:,}",
-                    "Total Cost": "{:,.2f}",
-                    "Avg Cost": "{:,.2f}",
-                    "Weight (kg)": "{:,.1f}",
-                    "Return %": "{:.1f}%",
-                }
-            ),
+            display_df,
+            column_config={
+                "Packages": COUNT_COLUMN,
+                "Total Cost": MONEY_COLUMN,
+                "Avg Cost": MONEY_COLUMN,
+                "Weight (kg)": WEIGHT_COLUMN,
+                "Return %": PERCENT_COLUMN,
+            },
             width="stretch",
             hide_index=True,
         )
 
 
-def show_trends_tab(analyzer: InvoiceAnalyzer, summary):
+def show_trends_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show trends tab content."""
     col1, col2 = st.columns([3, 1])
 
     with col2:
         period = st.radio("Time Period", ["week", "month"], horizontal=True)
 
-    trends = analyzer.analyze_trends(period=period)
+    # Both periods come from one cached computation, so toggling is free
+    trends = cached_analysis(sig, "analyze_trend_periods", analyzer)[period]
 
     st.subheader(f"Cost & Volume Trends (by {period})")
     fig = create_trend_chart(trends, summary.currency)
@@ -556,22 +592,21 @@ def show_trends_tab(analyzer: InvoiceAnalyzer, summary):
             "Avg Cost/Pkg",
         ]
         st.dataframe(
-            display_df.style.format(
-                {
-                    "Packages": "{:,}",
-                    "Total Cost": "{:,.2f}",
-                    "Weight (kg)": "{:,.1f}",
-                    "Avg Cost/Pkg": "{:,.2f}",
-                }
-            ),
+            display_df,
+            column_config={
+                "Packages": COUNT_COLUMN,
+                "Total Cost": MONEY_COLUMN,
+                "Weight (kg)": WEIGHT_COLUMN,
+                "Avg Cost/Pkg": MONEY_COLUMN,
+            },
             width="stretch",
             hide_index=True,
         )
 
 
-def show_returns_tab(analyzer: InvoiceAnalyzer):
+def show_returns_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show returns analysis tab content."""
-    returns_data = analyzer.analyze_returns()
+    returns_data = cached_analysis(sig, "analyze_returns", analyzer)
     summary_data = returns_data.get("summary", {})
 
     if not summary_data:
@@ -604,20 +639,19 @@ def show_returns_tab(analyzer: InvoiceAnalyzer):
         by_country = returns_data.get("by_country", pd.DataFrame())
         if not by_country.empty:
             st.dataframe(
-                by_country.style.format(
-                    {
-                        "return_count": "{:,}",
-                        "return_cost": "{:,.2f}",
-                    }
-                ),
+                by_country,
+                column_config={
+                    "return_count": COUNT_COLUMN,
+                    "return_cost": MONEY_COLUMN,
+                },
                 width="stretch",
                 hide_index=True,
             )
 
 
-def show_weights_tab(analyzer: InvoiceAnalyzer):
+def show_weights_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show weight analysis tab content."""
-    weight_data = analyzer.analyze_weights()
+    weight_data = cached_analysis(sig, "analyze_weights", analyzer)
     summary_data = weight_data.get("summary", {})
 
     if not summary_data:
@@ -660,9 +694,9 @@ def show_weights_tab(analyzer: InvoiceAnalyzer):
         st.plotly_chart(fig, key="weight_scatter", width="stretch")
 
 
-def show_services_tab(analyzer: InvoiceAnalyzer, summary):
+def show_services_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show service comparison tab content."""
-    by_service = analyzer.analyze_services()
+    by_service = cached_analysis(sig, "analyze_services", analyzer)
 
     st.subheader("Service Type Comparison")
     fig = create_service_comparison(by_service, summary.currency)
@@ -690,22 +724,21 @@ def show_services_tab(analyzer: InvoiceAnalyzer, summary):
             "Weight (kg)",
         ]
         st.dataframe(
-            display_df.style.format(
-                {
-                    "Packages": "{:,}",
-                    "Total Cost": "{:,.2f}",
-                    "Avg Cost": "{:,.2f}",
-                    "Weight (kg)": "{:,.1f}",
-                }
-            ),
+            display_df,
+            column_config={
+                "Packages": COUNT_COLUMN,
+                "Total Cost": MONEY_COLUMN,
+                "Avg Cost": MONEY_COLUMN,
+                "Weight (kg)": WEIGHT_COLUMN,
+            },
             width="stretch",
             hide_index=True,
         )
 
 
-def show_duties_tab(analyzer: InvoiceAnalyzer, summary):
+def show_duties_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show duties & brokerage analysis tab content."""
-    duties_data = analyzer.analyze_duties_and_brokerage()
+    duties_data = cached_analysis(sig, "analyze_duties_and_brokerage", analyzer)
     summary_data = duties_data.get("summary", {})
 
     if not summary_data:
@@ -762,9 +795,6 @@ def show_duties_tab(analyzer: InvoiceAnalyzer, summary):
     detail = duties_data.get("detail", pd.DataFrame())
     if not detail.empty:
         display_df = detail.copy()
-        display_df["shipment_date"] = pd.to_datetime(
-            display_df["shipment_date"]
-        ).dt.strftime("%Y-%m-%d")
         display_df.columns = [
             "Tracking #",
             "Country",
@@ -777,21 +807,21 @@ def show_duties_tab(analyzer: InvoiceAnalyzer, summary):
             "Customs",
         ]
         st.dataframe(
-            display_df.style.format(
-                {
-                    "Total": "{:,.2f}",
-                    "Brokerage": "{:,.2f}",
-                    "Customs": "{:,.2f}",
-                }
-            ),
+            display_df,
+            column_config={
+                "Date": DATE_COLUMN,
+                "Total": MONEY_COLUMN,
+                "Brokerage": MONEY_COLUMN,
+                "Customs": MONEY_COLUMN,
+            },
             use_container_width=True,
             hide_index=True,
         )
 
 
-def show_accessorials_tab(analyzer: InvoiceAnalyzer, summary):
+def show_accessorials_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show accessorials analysis tab content."""
-    acc_data = analyzer.analyze_accessorials()
+    acc_data = cached_analysis(sig, "analyze_accessorials", analyzer)
     summary_data = acc_data.get("summary", {})
 
     if not summary_data:
@@ -856,25 +886,24 @@ def show_accessorials_tab(analyzer: InvoiceAnalyzer, summary):
         display_df = by_charge_code.copy()
         display_df.columns = ["Code", "Description", "Total Cost", "Shipments"]
         st.dataframe(
-            display_df.style.format(
-                {
-                    "Total Cost": "{:,.2f}",
-                    "Shipments": "{:,}",
-                }
-            ),
+            display_df,
+            column_config={
+                "Total Cost": MONEY_COLUMN,
+                "Shipments": COUNT_COLUMN,
+            },
             use_container_width=True,
             hide_index=True,
         )
 
 
-def show_top_expenses_tab(analyzer: InvoiceAnalyzer, summary):
+def show_top_expenses_tab(analyzer: InvoiceAnalyzer, summary, sig: tuple):
     """Show top expenses tab content."""
     col1, col2 = st.columns([3, 1])
 
     with col2:
         n_items = st.slider("Number of items", min_value=10, max_value=50, value=20)
 
-    top_expenses = analyzer.get_top_expenses(n=n_items)
+    top_expenses = cached_analysis(sig, "get_top_expenses", analyzer, n=n_items)
 
     st.subheader(f"Top {n_items} Most Expensive Shipments")
 
@@ -883,11 +912,7 @@ def show_top_expenses_tab(analyzer: InvoiceAnalyzer, summary):
         return
 
     # Format for display
-    display_df = top_expenses.copy()
-    display_df["shipment_date"] = pd.to_datetime(
-        display_df["shipment_date"]
-    ).dt.strftime("%Y-%m-%d")
-    display_df = display_df[
+    display_df = top_expenses[
         [
             "tracking_number",
             "order_reference",
@@ -900,7 +925,7 @@ def show_top_expenses_tab(analyzer: InvoiceAnalyzer, summary):
             "total_charge",
             "is_return",
         ]
-    ]
+    ].copy()
     display_df.columns = [
         "Tracking #",
         "Reference",
@@ -915,16 +940,31 @@ def show_top_expenses_tab(analyzer: InvoiceAnalyzer, summary):
     ]
 
     st.dataframe(
-        display_df.style.format(
-            {
-                "Weight (kg)": "{:.1f}",
-                f"Cost ({summary.currency})": "{:,.2f}",
-            }
-        ),
+        display_df,
+        column_config={
+            "Date": DATE_COLUMN,
+            "Weight (kg)": WEIGHT_COLUMN,
+            f"Cost ({summary.currency})": MONEY_COLUMN,
+        },
         width="stretch",
         hide_index=True,
     )
 
 
+# Dashboard sections (label -> renderer), shown as a horizontal selector
+DASHBOARD_SECTIONS = {
+    "📊 Overview": show_overview_tab,
+    "💰 Cost Breakdown": show_cost_breakdown_tab,
+    "🌍 Destinations": show_destinations_tab,
+    "📈 Trends": show_trends_tab,
+    "↩️ Returns": show_returns_tab,
+    "⚖️ Weights": show_weights_tab,
+    "🚚 Services": show_services_tab,
+    "📦 Duties & Brokerage": show_duties_tab,
+    "🏷️ Accessorials": show_accessorials_tab,
+    "🔝 Top Expenses": show_top_expenses_tab,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -12,7 +12,10 @@ Provides analysis functions for UPS invoice data including:
 
 import pandas as pd
 import numpy as np
+from collections.abc import Callable, Mapping
 from dataclasses import dataclass
+from functools import wraps
+from types import MappingProxyType
 from typing import Any
 
 try:
@@ -22,6 +25,77 @@ try:
 except ImportError:
     HAS_PYCOUNTRY = False
 
+# ISO alpha-2 code -> country name, built once at import and read-only so
+# every analyzer shares it
+COUNTRY_NAMES: Mapping[str, str] = MappingProxyType(
+    {country.alpha_2: country.name for country in pycountry.countries}
+    if HAS_PYCOUNTRY
+    else {}
+)
+
+# Per-package fields taken from the first shipment row of each tracking number
+SHIPMENT_INFO_COLUMNS = [
+    "invoice_number",
+    "invoice_date",
+    "shipment_date",
+    "order_reference",
+    "service_code",
+    "service_name",
+    "actual_weight",
+    "billed_weight",
+    # Sender (Absender) - col67-73 - Account holder for outbound shipments
+    "sender_name",
+    "sender_city",
+    "sender_country",
+    # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
+    "recipient_name",
+    "recipient_company",
+    "recipient_city",
+    "recipient_country",
+    "shipment_type",
+    "shipment_subtype",
+    "goods_description",
+    "is_return",
+    "source_file",
+]
+
+# Columns shown for the most expensive packages, where present. For outbound
+# SHP shipments the recipient is the customer.
+TOP_EXPENSE_COLUMNS = (
+    "tracking_number",
+    "order_reference",
+    "shipment_date",
+    "recipient_name",  # Customer for outbound SHP shipments
+    "recipient_company",
+    "recipient_city",
+    "recipient_country",
+    "sender_name",  # Account holder for most shipments
+    "sender_country",
+    "service_name",
+    "billed_weight",
+    "goods_description",
+    "total_charge",
+    "shipment_type",
+    "is_return",
+)
+
+
+def _memoized(method: Callable) -> Callable:
+    """Cache an analysis result on the analyzer, keyed by method and arguments.
+
+    The underlying data never changes after construction, so each result is
+    computed once per analyzer. Callers must copy before mutating a result.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        key = (method.__name__, args, tuple(sorted(kwargs.items())))
+        if key not in self._cache:
+            self._cache[key] = method(self, *args, **kwargs)
+        return self._cache[key]
+
+    return wrapper
+
 
 @dataclass
 class AnalysisSummary:
@@ -45,14 +119,43 @@ class AnalysisSummary:
 class InvoiceAnalyzer:
     """Analyzer for UPS invoice data."""
 
-    def __init__(self, data: pd.DataFrame):
+    def __init__(self, data: pd.DataFrame, rows: np.ndarray | None = None):
         """Initialize analyzer with parsed invoice data.
 
         Args:
             data: DataFrame from UPSInvoiceParser
+            rows: Optional row positions selecting a subset of ``data``. The
+                subset is only materialized when an analysis first needs it.
         """
-        self.data = data
+        self._source = data
+        self._rows = rows
+        self._data: pd.DataFrame | None = data if rows is None else None
+        # Known without materializing a row subset
+        self._is_empty = (
+            data.empty if rows is None else len(rows) == 0 or len(data.columns) == 0
+        )
         self._packages: pd.DataFrame | None = None
+        self._summary: AnalysisSummary | None = None
+        self._cache: dict[tuple, Any] = {}
+        self._service_names: dict[str, str] | None = None
+        self._dated_rows: int | None = None
+        self._date_sorted = False
+
+    @property
+    def data(self) -> pd.DataFrame:
+        """Invoice rows covered by this analyzer."""
+        if self._data is None:
+            self._data = self._source.take(self._rows)
+        return self._data
+
+    def invalidate_cache(self) -> None:
+        """Drop memoized packages and analysis results."""
+        self._packages = None
+        self._summary = None
+        self._service_names = None
+        self._dated_rows = None
+        self._date_sorted = False
+        self._cache.clear()
 
     @property
     def packages(self) -> pd.DataFrame:
@@ -61,6 +164,73 @@ class InvoiceAnalyzer:
             self._packages = self._aggregate_packages()
         return self._packages
 
+    @_memoized
+    def _partition(self, column: str) -> dict[str, np.ndarray]:
+        """Row positions for each value of ``column``, from one group-by pass."""
+        return self.data.groupby(column, observed=True, sort=False).indices
+
+    def _rows_with(self, column: str, value: str) -> pd.DataFrame:
+        """Rows whose ``column`` equals ``value``, taken from the partition."""
+        positions = self._partition(column).get(value)
+        if positions is None:
+            return self.data.iloc[:0]
+        return self.data.take(positions)
+
+    @property
+    def service_names(self) -> dict[str, str]:
+        """Map each service code to its first service name, sorted by code."""
+        if self._service_names is None:
+            if "service_code" not in self.data.columns:
+                self._service_names = {}
+            else:
+                name_map = (
+                    self.data[["service_code", "service_name"]]
+                    .dropna()
+                    .drop_duplicates("service_code")
+                )
+                self._service_names = dict(
+                    sorted(zip(name_map["service_code"], name_map["service_name"]))
+                )
+        return self._service_names
+
+    @property
+    def date_min(self) -> pd.Timestamp | None:
+        """Earliest shipment date, or None if no row has a date."""
+        if not self._check_date_order():
+            return None
+        dates = self.data["shipment_date"]
+        return dates.iloc[0] if self._date_sorted else dates.min()
+
+    @property
+    def date_max(self) -> pd.Timestamp | None:
+        """Latest shipment date, or None if no row has a date."""
+        if not self._check_date_order():
+            return None
+        dates = self.data["shipment_date"]
+        return dates.iloc[self._dated_rows - 1] if self._date_sorted else dates.max()
+
+    def _check_date_order(self) -> int:
+        """Check once whether the data is sorted by shipment_date.
+
+        Data from combine_invoices() is sorted with undated rows last, which
+        makes date bounds O(1) and date filters a binary search.
+
+        Returns:
+            Number of rows with a shipment date
+        """
+        if self._dated_rows is None:
+            if "shipment_date" not in self.data.columns:
+                self._dated_rows = 0
+            else:
+                dates = self.data["shipment_date"]
+                valid = dates.notna().to_numpy()
+                self._dated_rows = int(valid.sum())
+                self._date_sorted = bool(
+                    valid[: self._dated_rows].all()
+                    and dates.iloc[: self._dated_rows].is_monotonic_increasing
+                )
+        return self._dated_rows
+
     def _aggregate_packages(self) -> pd.DataFrame:
         """Aggregate data by tracking number to get package-level view.
 
@@ -71,108 +241,66 @@ class InvoiceAnalyzer:
         This method pulls shipment info from FRT rows with package_indicator=1
         for accurate weight and service data.
         """
-        if self.data.empty:
+        if self._is_empty:
             return pd.DataFrame()
 
         df = self.data
 
+        # Factorize the tracking key once; every aggregation below groups on
+        # the resulting integer codes instead of rehashing the strings.
+        codes, tracking_numbers = pd.factorize(df["tracking_number"], sort=True)
+        keyed = codes >= 0
+        is_package = (df["package_indicator"] == "1").to_numpy() & keyed
+
         # Get shipment info from FRT rows with package_indicator=1
         # These rows have accurate weight data and service names
-        frt_rows = df[
-            (df["package_indicator"] == "1") & (df["charge_category"] == "FRT")
-        ].copy()
-
-        # For shipments without FRT rows, fall back to package_indicator=1 rows
-        pkg_rows = df[df["package_indicator"] == "1"].copy()
+        frt_mask = is_package & (df["charge_category"] == "FRT").to_numpy()
 
-        # Create base aggregation from FRT rows (preferred)
-        if not frt_rows.empty:
-            shipment_info = (
-                frt_rows.groupby("tracking_number")
-                .agg(
-                    {
-                        "invoice_number": "first",
-                        "invoice_date": "first",
-                        "shipment_date": "first",
-                        "order_reference": "first",
-                        "service_code": "first",
-                        "charge_description": "first",  # Service name from FRT row
-                        "actual_weight": "first",
-                        "billed_weight": "first",
-                        # Sender (Absender) - col67-73 - Account holder for outbound shipments
-                        "sender_name": "first",
-                        "sender_city": "first",
-                        "sender_country": "first",
-                        # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
-                        "recipient_name": "first",
-                        "recipient_company": "first",
-                        "recipient_city": "first",
-                        "recipient_country": "first",
-                        "shipment_type": "first",
-                        "shipment_subtype": "first",
-                        "goods_description": "first",
-                        "is_return": "first",
-                        "source_file": "first",
-                    }
-                )
-                .reset_index()
-            )
+        if frt_mask.any():
+            # Service name comes from the FRT row's charge description
+            info_cols = [
+                "charge_description" if col == "service_name" else col
+                for col in SHIPMENT_INFO_COLUMNS
+            ]
+            shipment_info = df.loc[frt_mask, info_cols].groupby(codes[frt_mask]).first()
             # Use charge_description as service_name
             shipment_info["service_name"] = shipment_info["charge_description"]
         else:
             # Fallback to any package rows
             shipment_info = (
-                pkg_rows.groupby("tracking_number")
-                .agg(
-                    {
-                        "invoice_number": "first",
-                        "invoice_date": "first",
-                        "shipment_date": "first",
-                        "order_reference": "first",
-                        "service_code": "first",
-                        "service_name": "first",
-                        "actual_weight": "first",
-                        "billed_weight": "first",
-                        # Sender (Absender) - col67-73 - Account holder for outbound shipments
-                        "sender_name": "first",
-                        "sender_city": "first",
-                        "sender_country": "first",
-                        # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
-                        "recipient_name": "first",
-                        "recipient_company": "first",
-                        "recipient_city": "first",
-                        "recipient_country": "first",
-                        "shipment_type": "first",
-                        "shipment_subtype": "first",
-                        "goods_description": "first",
-                        "is_return": "first",
-                        "source_file": "first",
-                    }
-                )
-                .reset_index()
+                df.loc[is_package, SHIPMENT_INFO_COLUMNS]
+                .groupby(codes[is_package])
+                .first()
             )
 
-        # Sum charges across ALL rows for each tracking number
-        charge_totals = (
-            df.groupby("tracking_number")
-            .agg(
-                {
-                    "discount_amount": "sum",
-                    "net_amount": "sum",
-                    "total_charge": "sum",
-                }
+        # Sum charges across ALL rows for each tracking number with a
+        # scatter-add over the group codes (missing amounts count as zero)
+        group_codes = shipment_info.index.to_numpy()
+        for col in ("discount_amount", "net_amount", "total_charge"):
+            amounts = np.nan_to_num(df[col].to_numpy(dtype=np.float64)[keyed])
+            totals = np.bincount(
+                codes[keyed], weights=amounts, minlength=len(tracking_numbers)
             )
-            .reset_index()
-        )
-
-        # Merge shipment info with charge totals
-        packages = shipment_info.merge(charge_totals, on="tracking_number", how="left")
+            shipment_info[col] = totals[group_codes]
+        shipment_info.insert(0, "tracking_number", tracking_numbers.take(group_codes))
+        packages = shipment_info.reset_index(drop=True)
 
         return packages
 
+    @property
+    def summary(self) -> AnalysisSummary:
+        """High-level summary statistics, computed once per analyzer."""
+        if self._summary is None:
+            self._summary = self._compute_summary()
+        return self._summary
+
     def get_summary(self) -> AnalysisSummary:
         """Get high-level summary statistics."""
-        if self.data.empty:
+        return self.summary
+
+    def _compute_summary(self) -> AnalysisSummary:
+        """Compute summary statistics with a single pass over the packages."""
+        if self._is_empty:
             return AnalysisSummary(
                 total_invoices=0,
                 total_packages=0,
@@ -193,82 +321,80 @@ class InvoiceAnalyzer:
         packages = self.packages
 
         # Charge breakdown
-        charge_totals = df.groupby("charge_category")["total_charge"].sum()
+        charge_totals = df.groupby("charge_category", observed=True, sort=False)[
+            "total_charge"
+        ].sum()
 
         # Date range
-        valid_dates = df["shipment_date"].dropna()
         date_range = None
-        if not valid_dates.empty:
+        if self.date_min is not None:
             date_range = (
-                valid_dates.min().strftime("%Y-%m-%d"),
-                valid_dates.max().strftime("%Y-%m-%d"),
+                self.date_min.strftime("%Y-%m-%d"),
+                self.date_max.strftime("%Y-%m-%d"),
             )
 
+        # Package-level totals in one aggregation
+        sums = {"total_charge": "sum", "billed_weight": "sum"}
+        if "is_return" in packages.columns:
+            sums["is_return"] = "sum"
+        totals = packages.agg(sums)
+        package_count = len(packages)
+
         # Top destination (use recipient_country as this data shows outbound shipments)
         top_dest = None
         if not packages.empty and "recipient_country" in packages.columns:
-            country_counts = packages["recipient_country"].value_counts()
-            # Filter out None/empty values
-            country_counts = country_counts[country_counts.index.notna()]
-            if not country_counts.empty:
-                top_dest = country_counts.index[0]
+            # mode() skips missing countries
+            modes = packages["recipient_country"].mode()
+            if not modes.empty:
+                top_dest = modes.iat[0]
 
         # Return rate
-        return_count = (
-            packages["is_return"].sum() if "is_return" in packages.columns else 0
-        )
-        return_rate = (return_count / len(packages) * 100) if len(packages) > 0 else 0
+        return_count = totals.get("is_return", 0)
+        return_rate = (return_count / package_count * 100) if package_count > 0 else 0
 
         # Currency (assume first non-null)
-        currency = (
-            df["currency"].dropna().iloc[0] if df["currency"].notna().any() else "EUR"
-        )
+        currencies = df["currency"].dropna()
+        currency = currencies.iloc[0] if len(currencies) else "EUR"
 
         return AnalysisSummary(
             total_invoices=df["invoice_number"].nunique(),
-            total_packages=len(packages),
-            total_cost=packages["total_charge"].sum(),
+            total_packages=package_count,
+            total_cost=totals["total_charge"],
             total_freight=charge_totals.get("FRT", 0),
             total_fuel_surcharge=charge_totals.get("FSC", 0),
             total_tax=charge_totals.get("TAX", 0),
             total_accessorial=charge_totals.get("ACC", 0),
-            avg_cost_per_package=packages["total_charge"].mean()
-            if len(packages) > 0
+            avg_cost_per_package=totals["total_charge"] / package_count
+            if package_count > 0
             else 0,
-            total_weight_kg=packages["billed_weight"].sum(),
+            total_weight_kg=totals["billed_weight"],
             date_range=date_range,
             top_destination_country=top_dest,
             return_rate=return_rate,
             currency=currency,
         )
 
+    @_memoized
     def analyze_cost_breakdown(self) -> pd.DataFrame:
         """Analyze costs by charge category.
 
         Returns:
             DataFrame with charge categories and their totals/percentages
         """
-        if self.data.empty:
+        if self._is_empty:
             return pd.DataFrame()
 
-        breakdown = (
-            self.data.groupby(["charge_category", "charge_category_name"])
-            .agg(
-                {
-                    "discount_amount": "sum",
-                    "net_amount": "sum",
-                    "total_charge": "sum",
-                }
-            )
-            .reset_index()
-        )
+        breakdown = self.data.groupby(
+            ["charge_category", "charge_category_name"], observed=True, sort=False
+        )[["discount_amount", "net_amount", "total_charge"]].sum()
 
-        # Calculate percentages
-        total = breakdown["total_charge"].sum()
-        breakdown["percentage"] = (breakdown["total_charge"] / total * 100).round(2)
+        # Percentages on the small per-category array
+        totals = breakdown["total_charge"].to_numpy()
+        breakdown["percentage"] = np.round(totals / totals.sum() * 100, 2)
 
-        return breakdown.sort_values("total_charge", ascending=False)
+        return breakdown.reset_index().sort_values("total_charge", ascending=False)
 
+    @_memoized
     def analyze_by_destination(self) -> pd.DataFrame:
         """Analyze costs and volume by destination country.
 
@@ -283,13 +409,9 @@ class InvoiceAnalyzer:
         if packages.empty:
             return pd.DataFrame()
 
-        # Filter out rows without recipient_country
-        valid_packages = packages[packages["recipient_country"].notna()].copy()
-        if valid_packages.empty:
-            return pd.DataFrame()
-
+        # Packages without recipient_country are skipped by the groupby
         by_country = (
-            valid_packages.groupby("recipient_country")
+            packages.groupby("recipient_country", observed=True, sort=False)
             .agg(
                 {
                     "tracking_number": "count",
@@ -300,6 +422,8 @@ class InvoiceAnalyzer:
             )
             .reset_index()
         )
+        if by_country.empty:
+            return pd.DataFrame()
 
         by_country.columns = [
             "country_code",
@@ -311,9 +435,7 @@ class InvoiceAnalyzer:
 
         # Add country names
         if HAS_PYCOUNTRY:
-            by_country["country_name"] = by_country["country_code"].apply(
-                self._get_country_name
-            )
+            by_country["country_name"] = self._country_names(by_country["country_code"])
         else:
             by_country["country_name"] = by_country["country_code"]
 
@@ -337,39 +459,54 @@ class InvoiceAnalyzer:
         Returns:
             DataFrame with time-series data
         """
-        packages = self.packages
-        if packages.empty or "shipment_date" not in packages.columns:
-            return pd.DataFrame()
+        return self.analyze_trend_periods()["week" if period == "week" else "month"]
 
-        # Remove rows without dates
-        packages = packages.dropna(subset=["shipment_date"])
-        if packages.empty:
-            return pd.DataFrame()
-
-        if period == "week":
-            packages["period"] = packages["shipment_date"].dt.strftime("%Y-W%W")
-        else:
-            packages["period"] = packages["shipment_date"].dt.strftime("%Y-%m")
-
-        trends = (
-            packages.groupby("period")
-            .agg(
-                {
-                    "tracking_number": "count",
-                    "total_charge": "sum",
-                    "billed_weight": "sum",
-                }
-            )
-            .reset_index()
-        )
+    @_memoized
+    def analyze_trend_periods(self) -> dict[str, pd.DataFrame]:
+        """Analyze weekly and monthly trends together.
 
-        trends.columns = ["period", "package_count", "total_cost", "total_weight"]
-        trends["avg_cost_per_package"] = (
-            trends["total_cost"] / trends["package_count"]
-        ).round(2)
+        Packages are grouped by shipment date once and the daily totals are
+        rolled up into both periods, so switching period is free.
 
-        return trends.sort_values("period")
+        Returns:
+            Dictionary with 'week' and 'month' time-series DataFrames
+        """
+        empty = {"week": pd.DataFrame(), "month": pd.DataFrame()}
+        packages = self.packages
+        if packages.empty or "shipment_date" not in packages.columns:
+            return empty
 
+        # Rows without dates are dropped by the groupby
+        daily = packages.groupby("shipment_date", sort=False).agg(
+            package_count=("tracking_number", "count"),
+            total_cost=("total_charge", "sum"),
+            total_weight=("billed_weight", "sum"),
+        )
+        if daily.empty:
+            return empty
+
+        days = daily.index
+        # Integer period keys: year * 100 + week number (as in "%W") or month
+        week_keys = days.year * 100 + (days.dayofyear + 6 - days.weekday) // 7
+        month_keys = days.year * 100 + days.month
+
+        trend_periods = {}
+        for period, keys in (("week", week_keys), ("month", month_keys)):
+            trends = daily.groupby(keys.to_numpy()).sum()
+            if period == "week":
+                labels = [f"{key // 100}-W{key % 100:02d}" for key in trends.index]
+            else:
+                labels = [f"{key // 100}-{key % 100:02d}" for key in trends.index]
+            trends.insert(0, "period", labels)
+            trends = trends.reset_index(drop=True)
+            trends["avg_cost_per_package"] = (
+                trends["total_cost"] / trends["package_count"]
+            ).round(2)
+            trend_periods[period] = trends
+
+        return trend_periods
+
+    @_memoized
     def analyze_returns(self) -> dict[str, Any]:
         """Analyze return shipments.
 
@@ -388,7 +525,7 @@ class InvoiceAnalyzer:
                 "by_country": pd.DataFrame(),
             }
 
-        returns = packages[packages["is_return"] == True]
+        returns = packages[packages["is_return"]]
 
         if returns.empty:
             return {
@@ -398,11 +535,12 @@ class InvoiceAnalyzer:
             }
 
         # Summary
+        return_costs = returns["total_charge"].to_numpy()
         summary = {
             "total_returns": len(returns),
-            "total_return_cost": returns["total_charge"].sum(),
+            "total_return_cost": np.nansum(return_costs),
             "return_rate": len(returns) / len(packages) * 100,
-            "avg_return_cost": returns["total_charge"].mean(),
+            "avg_return_cost": np.nanmean(return_costs),
         }
 
         # By shipment_subtype (closest thing to "reason" in UPS data)
@@ -410,7 +548,7 @@ class InvoiceAnalyzer:
         by_reason = pd.DataFrame()
         if "shipment_subtype" in returns.columns:
             by_reason = (
-                returns.groupby("shipment_subtype")
+                returns.groupby("shipment_subtype", observed=True)
                 .agg(
                     {
                         "tracking_number": "count",
@@ -425,7 +563,7 @@ class InvoiceAnalyzer:
         # By country (sender for returns - where the return is coming FROM)
         # For RTN shipments: sender=customer returning the package, recipient=account holder
         by_country = (
-            returns.groupby("sender_country")
+            returns.groupby("sender_country", observed=True)
             .agg(
                 {
                     "tracking_number": "count",
@@ -440,9 +578,7 @@ class InvoiceAnalyzer:
         by_country = by_country[by_country["country_code"].notna()]
 
         if HAS_PYCOUNTRY:
-            by_country["country_name"] = by_country["country_code"].apply(
-                self._get_country_name
-            )
+            by_country["country_name"] = self._country_names(by_country["country_code"])
 
         by_country = by_country.sort_values("return_count", ascending=False)
 
@@ -452,6 +588,7 @@ class InvoiceAnalyzer:
             "by_country": by_country,
         }
 
+    @_memoized
     def analyze_weights(self) -> dict[str, Any]:
         """Analyze package weights (actual vs billed).
 
@@ -465,31 +602,29 @@ class InvoiceAnalyzer:
         # Filter out zero/null weights
         weight_data = packages[
             (packages["billed_weight"] > 0) | (packages["actual_weight"] > 0)
-        ].copy()
+        ]
 
         if weight_data.empty:
             return {"summary": {}, "distribution": pd.DataFrame()}
 
-        weight_data["weight_diff"] = (
-            weight_data["billed_weight"] - weight_data["actual_weight"]
-        )
+        weight_diff = weight_data["billed_weight"] - weight_data["actual_weight"]
 
+        # Reduce the raw arrays directly, skipping pandas' reducer dispatch
+        actual = weight_data["actual_weight"].to_numpy(dtype=np.float64)
+        billed = weight_data["billed_weight"].to_numpy(dtype=np.float64)
+        total_actual = np.nansum(actual)
+        total_billed = np.nansum(billed)
         summary = {
-            "total_actual_weight": weight_data["actual_weight"].sum(),
-            "total_billed_weight": weight_data["billed_weight"].sum(),
-            "avg_actual_weight": weight_data["actual_weight"].mean(),
-            "avg_billed_weight": weight_data["billed_weight"].mean(),
+            "total_actual_weight": total_actual,
+            "total_billed_weight": total_billed,
+            "avg_actual_weight": np.nanmean(actual),
+            "avg_billed_weight": np.nanmean(billed),
             "weight_premium": (
-                (
-                    weight_data["billed_weight"].sum()
-                    - weight_data["actual_weight"].sum()
-                )
-                / weight_data["actual_weight"].sum()
-                * 100
-                if weight_data["actual_weight"].sum() > 0
+                (total_billed - total_actual) / total_actual * 100
+                if total_actual > 0
                 else 0
             ),
-            "packages_with_dim_weight": (weight_data["weight_diff"] > 0).sum(),
+            "packages_with_dim_weight": (weight_diff > 0).sum(),
         }
 
         # Weight distribution buckets
@@ -504,30 +639,36 @@ class InvoiceAnalyzer:
             "20-50kg",
             "50kg+",
         ]
-        weight_data["weight_bucket"] = pd.cut(
-            weight_data["billed_weight"], bins=bins, labels=labels
+        # Bin with one binary search per package; searchsorted(side="left")
+        # gives right-closed bins like pd.cut, so index 0 (<= 0) and
+        # len(bins) (NaN) fall outside every bucket
+        bucket = np.searchsorted(bins, billed, side="left")
+        in_range = (bucket > 0) & (bucket < len(bins))
+        bucket = bucket[in_range] - 1
+        counts = np.bincount(bucket, minlength=len(labels))
+        costs = np.bincount(
+            bucket,
+            weights=weight_data["total_charge"].to_numpy(dtype=np.float64)[in_range],
+            minlength=len(labels),
         )
-
-        distribution = (
-            weight_data.groupby("weight_bucket", observed=True)
-            .agg(
-                {
-                    "tracking_number": "count",
-                    "total_charge": "sum",
-                }
-            )
-            .reset_index()
+        observed = counts > 0
+        distribution = pd.DataFrame(
+            {
+                "weight_range": np.array(labels)[observed],
+                "package_count": counts[observed],
+                "total_cost": costs[observed],
+            }
         )
-        distribution.columns = ["weight_range", "package_count", "total_cost"]
 
         return {
             "summary": summary,
             "distribution": distribution,
             "detail": weight_data[
-                ["tracking_number", "actual_weight", "billed_weight", "weight_diff"]
-            ],
+                ["tracking_number", "actual_weight", "billed_weight"]
+            ].assign(weight_diff=weight_diff),
         }
 
+    @_memoized
     def analyze_services(self) -> pd.DataFrame:
         """Analyze costs by service type.
 
@@ -539,7 +680,9 @@ class InvoiceAnalyzer:
             return pd.DataFrame()
 
         by_service = (
-            packages.groupby(["service_code", "service_name"])
+            packages.groupby(
+                ["service_code", "service_name"], observed=True, sort=False
+            )
             .agg(
                 {
                     "tracking_number": "count",
@@ -564,6 +707,7 @@ class InvoiceAnalyzer:
 
         return by_service.sort_values("total_cost", ascending=False)
 
+    @_memoized
     def analyze_duties_and_brokerage(self) -> dict[str, Any]:
         """Analyze import duties and brokerage costs.
 
@@ -574,7 +718,7 @@ class InvoiceAnalyzer:
         Returns:
             Dictionary with summary, charge breakdown, by-country analysis, and detail
         """
-        if self.data.empty:
+        if self._is_empty:
             return {
                 "summary": {},
                 "by_charge_type": pd.DataFrame(),
@@ -582,10 +726,8 @@ class InvoiceAnalyzer:
                 "detail": pd.DataFrame(),
             }
 
-        df = self.data
-
         # Filter for IMP (import) shipments - these have duties/brokerage charges
-        imp_data = df[df["shipment_subtype"] == "IMP"].copy()
+        imp_data = self._rows_with("shipment_subtype", "IMP")
 
         if imp_data.empty:
             return {
@@ -621,7 +763,9 @@ class InvoiceAnalyzer:
 
         # Breakdown by charge type (BRK, GOV, etc.)
         by_charge_type = (
-            imp_data.groupby(["charge_category", "charge_category_name"])
+            imp_data.groupby(
+                ["charge_category", "charge_category_name"], observed=True, sort=False
+            )
             .agg(
                 {
                     "net_amount": "sum",
@@ -641,7 +785,7 @@ class InvoiceAnalyzer:
         # By destination country (recipient_country - where goods are imported to)
         # Get country from the FRT or first row per tracking
         country_data = (
-            imp_data.groupby("tracking_number")
+            imp_data.groupby("tracking_number", observed=True, sort=False)
             .agg(
                 {
                     "recipient_country": "first",
@@ -656,7 +800,7 @@ class InvoiceAnalyzer:
         )
 
         by_country = (
-            country_data.groupby("recipient_country")
+            country_data.groupby("recipient_country", observed=True, sort=False)
             .agg(
                 {
                     "tracking_number": "count",
@@ -669,9 +813,7 @@ class InvoiceAnalyzer:
         by_country = by_country[by_country["country_code"].notna()]
 
         if HAS_PYCOUNTRY:
-            by_country["country_name"] = by_country["country_code"].apply(
-                self._get_country_name
-            )
+            by_country["country_name"] = self._country_names(by_country["country_code"])
         else:
             by_country["country_name"] = by_country["country_code"]
 
@@ -681,16 +823,6 @@ class InvoiceAnalyzer:
         by_country = by_country.sort_values("total_cost", ascending=False)
 
         # Detail: Per-shipment breakdown with BRK and GOV costs
-        # Pivot to get BRK and GOV as separate columns
-        detail_pivot = imp_data.pivot_table(
-            index="tracking_number",
-            columns="charge_category",
-            values="net_amount",
-            aggfunc="sum",
-            fill_value=0,
-        ).reset_index()
-
-        # Merge with shipment info
         detail = country_data[
             [
                 "tracking_number",
@@ -701,37 +833,35 @@ class InvoiceAnalyzer:
                 "shipment_date",
                 "net_amount",
             ]
-        ].copy()
-        detail.columns = [
-            "tracking_number",
-            "country",
-            "recipient",
-            "city",
-            "order_reference",
-            "shipment_date",
-            "total_cost",
-        ]
-
-        # Add BRK and GOV columns if they exist
-        if "BRK" in detail_pivot.columns:
-            detail = detail.merge(
-                detail_pivot[["tracking_number", "BRK"]],
-                on="tracking_number",
-                how="left",
-            )
-            detail["BRK"] = detail["BRK"].fillna(0)
-        else:
-            detail["BRK"] = 0
+        ].rename(
+            columns={
+                "recipient_country": "country",
+                "recipient_name": "recipient",
+                "recipient_city": "city",
+                "net_amount": "total_cost",
+            }
+        )
 
-        if "GOV" in detail_pivot.columns:
-            detail = detail.merge(
-                detail_pivot[["tracking_number", "GOV"]],
-                on="tracking_number",
-                how="left",
-            )
-            detail["GOV"] = detail["GOV"].fillna(0)
-        else:
-            detail["GOV"] = 0
+        # Per-shipment charge totals, one column per charge category
+        by_category = (
+            imp_data.groupby(
+                ["tracking_number", "charge_category"], observed=True, sort=False
+            )["net_amount"]
+            .sum()
+            .unstack(fill_value=0.0)
+        )
+        by_category.columns = by_category.columns.astype(str)
+
+        # Add BRK and GOV columns, aligned on tracking number
+        for category in ("BRK", "GOV"):
+            if category in by_category.columns:
+                detail[category] = (
+                    by_category[category]
+                    .reindex(detail["tracking_number"], fill_value=0.0)
+                    .to_numpy()
+                )
+            else:
+                detail[category] = 0
 
         detail = detail.sort_values("total_cost", ascending=False)
 
@@ -742,6 +872,7 @@ class InvoiceAnalyzer:
             "detail": detail,
         }
 
+    @_memoized
     def analyze_accessorials(self) -> dict[str, Any]:
         """Analyze accessorial charges (ACC).
 
@@ -756,7 +887,7 @@ class InvoiceAnalyzer:
         Returns:
             Dictionary with summary, breakdown by charge code, by country, and trends
         """
-        if self.data.empty:
+        if self._is_empty:
             return {
                 "summary": {},
                 "by_charge_code": pd.DataFrame(),
@@ -767,7 +898,7 @@ class InvoiceAnalyzer:
         df = self.data
 
         # Filter for ACC (Accessorial) charges
-        acc_data = df[df["charge_category"] == "ACC"].copy()
+        acc_data = self._rows_with("charge_category", "ACC")
 
         if acc_data.empty:
             return {
@@ -807,7 +938,9 @@ class InvoiceAnalyzer:
 
         # Breakdown by charge code
         by_charge_code = (
-            acc_data.groupby(["charge_code", "charge_description"])
+            acc_data.groupby(
+                ["charge_code", "charge_description"], observed=True, sort=False
+            )
             .agg(
                 {
                     "net_amount": "sum",
@@ -825,29 +958,23 @@ class InvoiceAnalyzer:
         by_charge_code = by_charge_code.sort_values("total_cost", ascending=False)
 
         # By destination country
-        # First get country per tracking, then sum accessorial costs
-        tracking_country = (
-            df[df["recipient_country"].notna()]
-            .groupby("tracking_number")["recipient_country"]
-            .first()
-            .reset_index()
-        )
-
-        acc_by_tracking = (
-            acc_data.groupby("tracking_number")["net_amount"].sum().reset_index()
-        )
-        acc_by_tracking.columns = ["tracking_number", "acc_cost"]
-
-        acc_with_country = acc_by_tracking.merge(
-            tracking_country, on="tracking_number", how="left"
+        # Look up each tracking number's first known country, then group the
+        # accessorial rows by it directly
+        country_per_tracking = (
+            df[["tracking_number", "recipient_country"]]
+            .dropna()
+            .drop_duplicates("tracking_number")
+            .set_index("tracking_number")["recipient_country"]
         )
-
         by_country = (
-            acc_with_country.groupby("recipient_country")
+            acc_data.assign(
+                country=acc_data["tracking_number"].map(country_per_tracking)
+            )
+            .groupby("country", observed=True, sort=False)
             .agg(
                 {
-                    "tracking_number": "count",
-                    "acc_cost": "sum",
+                    "tracking_number": "nunique",
+                    "net_amount": "sum",
                 }
             )
             .reset_index()
@@ -856,9 +983,7 @@ class InvoiceAnalyzer:
         by_country = by_country[by_country["country_code"].notna()]
 
         if HAS_PYCOUNTRY:
-            by_country["country_name"] = by_country["country_code"].apply(
-                self._get_country_name
-            )
+            by_country["country_name"] = self._country_names(by_country["country_code"])
         else:
             by_country["country_name"] = by_country["country_code"]
 
@@ -873,21 +998,17 @@ class InvoiceAnalyzer:
             "shipment_date" in acc_data.columns
             and acc_data["shipment_date"].notna().any()
         ):
-            acc_data_with_dates = acc_data[acc_data["shipment_date"].notna()].copy()
-            acc_data_with_dates["period"] = acc_data_with_dates[
-                "shipment_date"
-            ].dt.strftime("%Y-%m")
-
-            trends = (
-                acc_data_with_dates.groupby("period")
-                .agg(
-                    {
-                        "net_amount": "sum",
-                        "tracking_number": "nunique",
-                    }
-                )
-                .reset_index()
+            # Group on integer-backed monthly periods (rows without dates are
+            # dropped) and format only the resulting labels
+            periods = acc_data["shipment_date"].dt.to_period("M")
+            trends = acc_data.groupby(periods, sort=False).agg(
+                {
+                    "net_amount": "sum",
+                    "tracking_number": "nunique",
+                }
             )
+            trends.index = trends.index.astype(str)
+            trends = trends.reset_index()
             trends.columns = ["period", "total_cost", "shipment_count"]
             trends = trends.sort_values("period")
 
@@ -898,6 +1019,7 @@ class InvoiceAnalyzer:
             "trends": trends,
         }
 
+    @_memoized
     def get_top_expenses(self, n: int = 20) -> pd.DataFrame:
         """Get the most expensive packages.
 
@@ -911,30 +1033,35 @@ class InvoiceAnalyzer:
         if packages.empty:
             return pd.DataFrame()
 
-        # Build column list dynamically based on what's available
-        # For outbound SHP shipments: recipient is the customer
-        desired_cols = [
-            "tracking_number",
-            "order_reference",
-            "shipment_date",
-            "recipient_name",  # Customer for outbound SHP shipments
-            "recipient_company",
-            "recipient_city",
-            "recipient_country",
-            "sender_name",  # Account holder for most shipments
-            "sender_country",
-            "service_name",
-            "billed_weight",
-            "goods_description",
-            "total_charge",
-            "shipment_type",
-            "is_return",
-        ]
-        # Only include columns that exist in packages
-        available_cols = [col for col in desired_cols if col in packages.columns]
-        top = packages.nlargest(n, "total_charge")[available_cols].copy()
+        positions = self._top_positions(packages["total_charge"], n)
+        return packages[self._top_expense_columns()].iloc[positions]
+
+    @_memoized
+    def _top_expense_columns(self) -> list[str]:
+        """TOP_EXPENSE_COLUMNS present in this analyzer's packages."""
+        return [col for col in TOP_EXPENSE_COLUMNS if col in self.packages.columns]
 
-        return top
+    @staticmethod
+    def _top_positions(values: pd.Series, n: int) -> np.ndarray:
+        """Positions of the n largest values, like ``nlargest(keep="first")``.
+
+        np.partition finds the n-th largest value in linear time; only the
+        selected positions are sorted (descending, ties by position).
+        """
+        charges = values.to_numpy(dtype=np.float64)
+        missing = np.isnan(charges)
+        positions = np.flatnonzero(~missing)
+        if n <= 0:
+            return positions[:0]
+        if n < len(positions):
+            valid = charges[positions]
+            cutoff = np.partition(valid, len(valid) - n)[len(valid) - n]
+            above = positions[valid > cutoff]
+            ties = positions[valid == cutoff][: n - len(above)]
+            positions = np.concatenate([above, ties])
+        positions = positions[np.lexsort((positions, -charges[positions]))]
+        # nlargest pads with missing values once the valid ones run out
+        return np.concatenate([positions, np.flatnonzero(missing)])[:n]
 
     def filter_data(
         self,
@@ -954,35 +1081,55 @@ class InvoiceAnalyzer:
             returns_only: Only include return shipments
 
         Returns:
-            New InvoiceAnalyzer with filtered data
+            New InvoiceAnalyzer over the matching rows (not copied until used)
         """
-        filtered = self.data.copy()
+        data = self.data
+        offset = 0
+
+        if (start_date or end_date) and self._check_date_order() and self._date_sorted:
+            # Sorted by date: the range is a contiguous slice of the dated rows
+            dates = data["shipment_date"].iloc[: self._dated_rows]
+            lo = dates.searchsorted(pd.Timestamp(start_date)) if start_date else 0
+            hi = (
+                dates.searchsorted(pd.Timestamp(end_date), side="right")
+                if end_date
+                else len(dates)
+            )
+            data = data.iloc[lo:hi]
+            offset = lo
+            start_date = end_date = None
+
+        # Combine all remaining conditions into one mask of row positions
+        mask = np.ones(len(data), dtype=bool)
 
         if start_date:
-            filtered = filtered[filtered["shipment_date"] >= start_date]
+            mask &= (data["shipment_date"] >= start_date).to_numpy()
 
         if end_date:
-            filtered = filtered[filtered["shipment_date"] <= end_date]
+            mask &= (data["shipment_date"] <= end_date).to_numpy()
 
         if countries:
             # Use recipient_country as this data shows outbound shipments
-            filtered = filtered[filtered["recipient_country"].isin(countries)]
+            mask &= self._isin(data["recipient_country"], countries)
 
         if services:
-            filtered = filtered[filtered["service_code"].isin(services)]
+            mask &= self._isin(data["service_code"], services)
 
         if returns_only:
-            filtered = filtered[filtered["is_return"] == True]
+            mask &= data["is_return"].to_numpy(dtype=bool)
 
-        return InvoiceAnalyzer(filtered)
+        return InvoiceAnalyzer(self.data, rows=offset + np.flatnonzero(mask))
+
+    @staticmethod
+    def _isin(column: pd.Series, values: list[str]) -> np.ndarray:
+        """Membership mask, matched on integer codes for categorical columns."""
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            codes = column.cat.categories.get_indexer(values)
+            return np.isin(column.cat.codes.to_numpy(), codes[codes >= 0])
+        return column.isin(values).to_numpy()
 
     @staticmethod
-    def _get_country_name(code: str) -> str:
-        """Get country name from ISO code."""
-        if not HAS_PYCOUNTRY or not code:
-            return code or "Unknown"
-        try:
-            country = pycountry.countries.get(alpha_2=code)
-            return country.name if country else code
-        except Exception:
-            return code
+    def _country_names(codes: pd.Series) -> pd.Series:
+        """Map ISO codes to country names, keeping codes without a match."""
+        codes = codes.astype(object)
+        return codes.map(COUNTRY_NAMES).fillna(codes)
@@ -4,11 +4,58 @@ Parses UPS Billing Data CSV exports (no headers) and extracts key fields
 into a structured DataFrame for analysis.
 """
 
+import numpy as np
 import pandas as pd
+import codecs
+import hashlib
 import io
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from pathlib import Path
 from typing import BinaryIO
 
+from pandas.api.types import union_categoricals
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def _arrow_string_dtype() -> pd.StringDtype | None:
+    """Arrow-backed string dtype with NaN for missing values, if available.
+
+    This is pandas 3's default ``str`` dtype; pandas 2.1/2.2 spell it
+    ``string[pyarrow_numpy]``. Older versions keep object strings.
+    """
+    if not HAS_PYARROW:
+        return None
+    for options in (
+        {"storage": "pyarrow", "na_value": np.nan},
+        {"storage": "pyarrow_numpy"},
+    ):
+        try:
+            return pd.StringDtype(**options)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+ARROW_STRING_DTYPE = _arrow_string_dtype()
+
+
+class _ShortRowsError(Exception):
+    """A CSV row had fewer fields than the first row.
+
+    pyarrow can only skip or reject such rows, whereas pandas pads them with
+    NaN; readers catch this and re-read the file with pandas.
+    """
+
 
 # UPS Billing Data CSV column mapping (0-indexed)
 # Based on UPS Billing Data export format (verified against actual invoices)
@@ -109,12 +156,40 @@ CHARGE_CATEGORIES = {
     "RES": "Residential Surcharge",
 }
 
+# Repeated string columns stored as categoricals by the parser, so the
+# analyzer's group-bys hash integer codes instead of strings
+CATEGORY_COLUMNS = [
+    "tracking_number",
+    "currency",
+    "package_indicator",
+    "service_code",
+    "shipment_type",
+    "shipment_subtype",
+    "charge_category",
+    "charge_category_name",
+    "charge_code",
+    "sender_country",
+    "recipient_country",
+    "source_file",
+]
+
+# Bytes read from the start of a file to detect its encoding
+SNIFF_BYTES = 1 << 16
+
+# Date format of UPS billing exports (pandas' fast ISO 8601 parser)
+DATE_FORMAT = "ISO8601"
+
+# Weight columns downcast to float32 (money columns stay float64 so totals
+# reconcile with the invoice to the cent)
+WEIGHT_COLUMNS = ["actual_weight", "billed_weight", "weight_difference"]
+
 
 class UPSInvoiceParser:
     """Parser for UPS Billing Data CSV files."""
 
     def __init__(self):
-        self.raw_data: pd.DataFrame | None = None
+        # Shape of the last raw CSV read; the raw frame itself is not kept
+        self.raw_shape: tuple[int, int] | None = None
         self.parsed_data: pd.DataFrame | None = None
 
     def parse_file(self, file: BinaryIO, filename: str = "uploaded") -> pd.DataFrame:
@@ -127,19 +202,14 @@ class UPSInvoiceParser:
         Returns:
             DataFrame with parsed invoice data
         """
-        content = file.read()
-        if isinstance(content, bytes):
-            # Try different encodings - UPS exports often use latin-1 or cp1252
-            for encoding in ["utf-8", "latin-1", "cp1252"]:
-                try:
-                    content = content.decode(encoding)
-                    break
-                except UnicodeDecodeError:
-                    continue
-            else:
-                content = content.decode("utf-8", errors="replace")
+        if not file.seekable():
+            content = file.read()
+            if isinstance(content, str):
+                return self.parse_csv_content(content, filename)
+            file = io.BytesIO(content)
 
-        return self.parse_csv_content(content, filename)
+        # Parse the bytes directly, without decoding a str copy first
+        return self._build_frame(self._read_csv_file(file), filename)
 
     def parse_csv_content(
         self, content: str, filename: str = "uploaded"
@@ -153,30 +223,21 @@ class UPSInvoiceParser:
         Returns:
             DataFrame with parsed invoice data
         """
-        # Read CSV without headers
-        df = pd.read_csv(
-            io.StringIO(content),
-            header=None,
-            dtype=str,
-            on_bad_lines="skip",
-        )
-
-        self.raw_data = df
-
-        # Extract relevant columns
-        parsed = pd.DataFrame()
-
-        # Map columns that exist
-        max_col = len(df.columns)
-
-        for field_name, col_idx in COLUMN_MAPPING.items():
-            if col_idx < max_col:
-                parsed[field_name] = df.iloc[:, col_idx]
-            else:
-                parsed[field_name] = None
-
-        # Add source filename
-        parsed["source_file"] = filename
+        # Read CSV without headers (columns are labelled by index)
+        return self._build_frame(self._read_csv(content), filename)
+
+    def _build_frame(self, df: pd.DataFrame, filename: str) -> pd.DataFrame:
+        """Map raw CSV columns to named fields and add derived fields."""
+        self.raw_shape = df.shape
+
+        # Map columns that exist (missing ones are left empty) and add the
+        # source filename, building the frame in one go
+        columns = {
+            field_name: df[col_idx] if col_idx in df.columns else None
+            for field_name, col_idx in COLUMN_MAPPING.items()
+        }
+        columns["source_file"] = filename
+        parsed = pd.DataFrame(columns, index=df.index)
 
         # Convert data types
         parsed = self._convert_types(parsed)
@@ -184,9 +245,135 @@ class UPSInvoiceParser:
         # Add derived fields
         parsed = self._add_derived_fields(parsed)
 
+        # Store repeated strings as integer codes; derived fields above are
+        # computed on the plain strings first
+        for col in CATEGORY_COLUMNS:
+            parsed[col] = parsed[col].astype("category")
+
         self.parsed_data = parsed
         return parsed
 
+    def _read_csv(self, content: str) -> pd.DataFrame:
+        """Read headerless CSV content as strings, labelling columns by index.
+
+        Uses pyarrow's multi-threaded reader when available, reading only the
+        columns in COLUMN_MAPPING. Falls back to pandas' C parser without
+        pyarrow, or when a row has too few fields.
+        """
+        if HAS_PYARROW:
+            try:
+                return self._read_csv_pyarrow(io.BytesIO(content.encode("utf-8")))
+            except _ShortRowsError:
+                pass
+
+        return self._read_csv_pandas(io.StringIO(content))
+
+    def _read_csv_file(self, file: BinaryIO) -> pd.DataFrame:
+        """Read a CSV byte stream, detecting its encoding.
+
+        UPS exports are UTF-8 or latin-1/cp1252. A sample decides the first
+        attempt; if invalid UTF-8 only shows up later in the file, the read
+        is retried as latin-1. Files with short rows are read with pandas.
+        """
+        start = file.tell()
+        sample = file.read(SNIFF_BYTES)
+        file.seek(start)
+
+        encoding = _sniff_encoding(sample)
+        if HAS_PYARROW:
+            try:
+                if encoding != "utf-8":
+                    return self._read_csv_pyarrow(file, encoding=encoding)
+                try:
+                    return self._read_csv_pyarrow(file)
+                except pa.ArrowInvalid:
+                    file.seek(start)
+                    return self._read_csv_pyarrow(file, encoding="latin-1")
+            except _ShortRowsError:
+                file.seek(start)
+
+        try:
+            return self._read_csv_pandas(file, encoding=encoding)
+        except UnicodeDecodeError:
+            file.seek(start)
+            return self._read_csv_pandas(file, encoding="latin-1")
+
+    def _read_csv_pandas(
+        self, source: BinaryIO | io.StringIO, encoding: str | None = None
+    ) -> pd.DataFrame:
+        """Read the columns in COLUMN_MAPPING with pandas' C parser.
+
+        Files narrower than the mapping are read in full instead, since
+        pandas rejects a usecols list naming missing columns.
+        """
+        start = source.tell()
+        options = {"header": None, "dtype": str, "on_bad_lines": "skip"}
+        try:
+            return pd.read_csv(
+                source,
+                encoding=encoding,
+                usecols=sorted(set(COLUMN_MAPPING.values())),
+                **options,
+            )
+        except UnicodeDecodeError:
+            raise
+        except ValueError:
+            source.seek(start)
+            return pd.read_csv(source, encoding=encoding, **options)
+
+    def _read_csv_pyarrow(self, file: BinaryIO, encoding: str = "utf8") -> pd.DataFrame:
+        """Read the columns in COLUMN_MAPPING from a CSV byte stream as strings.
+
+        Raises:
+            _ShortRowsError: A row has fewer fields than the first row
+        """
+        columns = sorted(set(COLUMN_MAPPING.values()))
+        names = [f"f{i}" for i in columns]
+
+        # Like on_bad_lines="skip" in pandas, rows with too many fields are
+        # skipped. pandas pads short rows with NaN instead, which pyarrow
+        # cannot do, so a short row aborts the read
+        short_rows = []
+
+        def handle_invalid_row(row) -> str:
+            if row.actual_columns > row.expected_columns:
+                return "skip"
+            short_rows.append(row.text)
+            return "error"
+
+        try:
+            table = pa_csv.read_csv(
+                file,
+                read_options=pa_csv.ReadOptions(
+                    autogenerate_column_names=True,
+                    use_threads=True,
+                    block_size=8 << 20,
+                    encoding=encoding,
+                ),
+                parse_options=pa_csv.ParseOptions(
+                    invalid_row_handler=handle_invalid_row
+                ),
+                convert_options=pa_csv.ConvertOptions(
+                    include_columns=names,
+                    include_missing_columns=True,
+                    column_types={name: pa.string() for name in names},
+                    strings_can_be_null=True,
+                ),
+            )
+        except pa.ArrowInvalid as e:
+            if short_rows:
+                raise _ShortRowsError(f"Too few fields: {short_rows[0]!r}") from e
+            raise
+        # Keep the strings in Arrow memory rather than one Python object per cell
+        types_mapper = (
+            {pa.string(): ARROW_STRING_DTYPE}.get if ARROW_STRING_DTYPE else None
+        )
+        df = table.to_pandas(
+            split_blocks=True, self_destruct=True, types_mapper=types_mapper
+        )
+        df.columns = columns
+        return df
+
     def parse_multiple_files(self, files: list[tuple[BinaryIO, str]]) -> pd.DataFrame:
         """Parse multiple CSV files and combine into single DataFrame.
 
@@ -198,18 +385,27 @@ class UPSInvoiceParser:
         """
         all_data = []
 
-        for file_obj, filename in files:
-            try:
-                df = self.parse_file(file_obj, filename)
-                all_data.append(df)
-            except Exception as e:
-                print(f"Error parsing {filename}: {e}")
-                continue
+        # Each file gets its own parser so the workers share no state; the
+        # pyarrow reader and most of the type conversion release the GIL
+        parsers = [UPSInvoiceParser() for _ in files]
+        with ThreadPoolExecutor(max_workers=_max_workers(len(files))) as executor:
+            futures = [
+                (filename, executor.submit(parser.parse_file, file_obj, filename))
+                for parser, (file_obj, filename) in zip(parsers, files)
+            ]
+            for filename, future in futures:
+                try:
+                    all_data.append(future.result())
+                except Exception as e:
+                    print(f"Error parsing {filename}: {e}")
+                    continue
 
+        if parsers:
+            self.raw_shape = parsers[-1].raw_shape
         if not all_data:
             return pd.DataFrame()
 
-        combined = pd.concat(all_data, ignore_index=True)
+        combined = _concat_frames(all_data)
         self.parsed_data = combined
         return combined
 
@@ -234,7 +430,12 @@ class UPSInvoiceParser:
 
         for col in date_cols:
             if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors="coerce")
+                # UPS exports use ISO dates; naming the format skips per-column
+                # format guessing. Files in another format are still inferred.
+                parsed = pd.to_datetime(df[col], errors="coerce", format=DATE_FORMAT)
+                if parsed.isna().all() and df[col].notna().any():
+                    parsed = pd.to_datetime(df[col], errors="coerce")
+                df[col] = parsed
 
         # Clean string columns - strip whitespace
         string_cols = [
@@ -258,10 +459,15 @@ class UPSInvoiceParser:
             "shipment_type",
             "shipment_subtype",
         ]
+        # Blank cells and literal "nan"/"None" become missing; the columns
+        # are already strings, so strip and mask in one pass each
+        empty_values = ["", "nan", "None"]
         for col in string_cols:
             if col in df.columns:
-                df[col] = df[col].astype(str).str.strip()
-                df[col] = df[col].replace({"nan": None, "": None})
+                stripped = df[col].str.strip()
+                df[col] = stripped.mask(
+                    stripped.isna() | stripped.isin(empty_values), None
+                )
 
         return df
 
@@ -274,13 +480,21 @@ class UPSInvoiceParser:
         # Service name: Use charge_description from FRT rows as primary source
         # The charge_description on FRT rows contains the actual service name (e.g., "TB Standard", "WW Express Saver")
         # Fall back to SERVICE_CODES mapping only if charge_description is empty
-        df["service_name"] = df.apply(
-            lambda row: row["charge_description"]
-            if row["charge_category"] == "FRT"
-            and pd.notna(row["charge_description"])
-            and row["charge_description"].strip()
-            else SERVICE_CODES.get(row["service_code"], "Other"),
-            axis=1,
+        # (descriptions are already stripped, with blanks turned into None)
+        # Look names up once per distinct service code, then expand by code;
+        # a missing code (-1) picks the trailing "Other"
+        service_codes = df["service_code"].astype("category")
+        df["service_code"] = service_codes
+        names = service_codes.cat.categories.map(SERVICE_CODES).fillna("Other")
+        lookup = np.append(names.to_numpy(dtype=object), "Other")
+        fallback_names = pd.Series(
+            lookup[service_codes.cat.codes.to_numpy()], index=df.index
+        )
+        has_description = (df["charge_category"] == "FRT") & df[
+            "charge_description"
+        ].notna()
+        df["service_name"] = df["charge_description"].where(
+            has_description, fallback_names
         )
 
         # Charge category name
@@ -294,14 +508,20 @@ class UPSInvoiceParser:
         # Is this a return shipment?
         df["is_return"] = df["shipment_type"] == "RTN"
 
-        # Weight difference (billed vs actual)
-        df["weight_difference"] = df["billed_weight"] - df["actual_weight"]
+        # Weight difference (billed vs actual); both columns share the
+        # frame's index, so subtract the arrays without aligning
+        df["weight_difference"] = np.subtract(
+            df["billed_weight"].to_numpy(), df["actual_weight"].to_numpy()
+        )
 
         # Extract week and month for trend analysis
         if df["shipment_date"].notna().any():
             df["shipment_week"] = df["shipment_date"].dt.isocalendar().week
-            df["shipment_month"] = df["shipment_date"].dt.to_period("M").astype(str)
-            df["shipment_year_month"] = df["shipment_date"].dt.strftime("%Y-%m")
+            # Format each distinct month once; undated rows stay missing
+            codes, months = pd.factorize(df["shipment_date"].dt.to_period("M"))
+            df["shipment_month"] = pd.Categorical.from_codes(codes, months.astype(str))
+            # Kept for callers of the older column name; same categorical
+            df["shipment_year_month"] = df["shipment_month"]
 
         return df
 
@@ -323,100 +543,108 @@ class UPSInvoiceParser:
 
         df = self.parsed_data
 
+        # Packages are listed in order of first appearance
         # Get shipment info from FRT rows with package_indicator=1
         # These rows have accurate weight data and service names
         frt_rows = df[
             (df["package_indicator"] == "1") & (df["charge_category"] == "FRT")
-        ].copy()
+        ]
 
         # For shipments without FRT rows, fall back to package_indicator=1 rows
-        pkg_rows = df[df["package_indicator"] == "1"].copy()
+        pkg_rows = df[df["package_indicator"] == "1"]
+
+        # With one row per tracking number each row is already a package,
+        # so the group-bys below reduce to plain selections
+        tracking = df["tracking_number"]
+        single_rows = bool(tracking.notna().all() and tracking.is_unique)
 
         # Create base aggregation from FRT rows (preferred)
         if not frt_rows.empty:
-            shipment_info = (
-                frt_rows.groupby("tracking_number")
-                .agg(
-                    {
-                        "invoice_number": "first",
-                        "invoice_date": "first",
-                        "shipment_date": "first",
-                        "order_reference": "first",
-                        "service_code": "first",
-                        "charge_description": "first",  # Service name from FRT row
-                        "actual_weight": "first",
-                        "billed_weight": "first",
-                        # Sender (Absender) - col67-73 - Account holder for outbound shipments
-                        "sender_name": "first",
-                        "sender_city": "first",
-                        "sender_country": "first",
-                        # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
-                        "recipient_name": "first",
-                        "recipient_company": "first",
-                        "recipient_city": "first",
-                        "recipient_country": "first",
-                        "shipment_type": "first",
-                        "shipment_subtype": "first",
-                        "goods_description": "first",
-                        "is_return": "first",
-                        "source_file": "first",
-                    }
-                )
-                .reset_index()
+            shipment_info = self._first_by_tracking(
+                frt_rows,
+                single_rows,
+                {
+                    "invoice_number": "first",
+                    "invoice_date": "first",
+                    "shipment_date": "first",
+                    "order_reference": "first",
+                    "service_code": "first",
+                    "charge_description": "first",  # Service name from FRT row
+                    "actual_weight": "first",
+                    "billed_weight": "first",
+                    # Sender (Absender) - col67-73 - Account holder for outbound shipments
+                    "sender_name": "first",
+                    "sender_city": "first",
+                    "sender_country": "first",
+                    # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
+                    "recipient_name": "first",
+                    "recipient_company": "first",
+                    "recipient_city": "first",
+                    "recipient_country": "first",
+                    "shipment_type": "first",
+                    "shipment_subtype": "first",
+                    "goods_description": "first",
+                    "is_return": "first",
+                    "source_file": "first",
+                },
             )
             # Use charge_description as service_name
             shipment_info["service_name"] = shipment_info["charge_description"]
         else:
             # Fallback to any package rows
-            shipment_info = (
-                pkg_rows.groupby("tracking_number")
-                .agg(
-                    {
-                        "invoice_number": "first",
-                        "invoice_date": "first",
-                        "shipment_date": "first",
-                        "order_reference": "first",
-                        "service_code": "first",
-                        "service_name": "first",
-                        "actual_weight": "first",
-                        "billed_weight": "first",
-                        # Sender (Absender) - col67-73 - Account holder for outbound shipments
-                        "sender_name": "first",
-                        "sender_city": "first",
-                        "sender_country": "first",
-                        # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
-                        "recipient_name": "first",
-                        "recipient_company": "first",
-                        "recipient_city": "first",
-                        "recipient_country": "first",
-                        "shipment_type": "first",
-                        "shipment_subtype": "first",
-                        "goods_description": "first",
-                        "is_return": "first",
-                        "source_file": "first",
-                    }
-                )
-                .reset_index()
-            )
-
-        # Sum charges across ALL rows for each tracking number
-        charge_totals = (
-            df.groupby("tracking_number")
-            .agg(
+            shipment_info = self._first_by_tracking(
+                pkg_rows,
+                single_rows,
                 {
-                    "discount_amount": "sum",
-                    "net_amount": "sum",
-                    "total_charge": "sum",
-                }
+                    "invoice_number": "first",
+                    "invoice_date": "first",
+                    "shipment_date": "first",
+                    "order_reference": "first",
+                    "service_code": "first",
+                    "service_name": "first",
+                    "actual_weight": "first",
+                    "billed_weight": "first",
+                    # Sender (Absender) - col67-73 - Account holder for outbound shipments
+                    "sender_name": "first",
+                    "sender_city": "first",
+                    "sender_country": "first",
+                    # Recipient (Empfänger) - col74-81 - Customer for outbound shipments
+                    "recipient_name": "first",
+                    "recipient_company": "first",
+                    "recipient_city": "first",
+                    "recipient_country": "first",
+                    "shipment_type": "first",
+                    "shipment_subtype": "first",
+                    "goods_description": "first",
+                    "is_return": "first",
+                    "source_file": "first",
+                },
             )
-            .reset_index()
-        )
 
-        # Merge shipment info with charge totals
-        packages = shipment_info.merge(charge_totals, on="tracking_number", how="left")
+        # Sum charges across ALL rows for each tracking number (unsorted; the
+        # join below aligns on the index)
+        charge_columns = ["discount_amount", "net_amount", "total_charge"]
+        if single_rows:
+            charge_totals = df.set_index("tracking_number")[charge_columns]
+        else:
+            charge_totals = df.groupby("tracking_number", observed=True, sort=False)[
+                charge_columns
+            ].sum()
+
+        # Join charge totals onto shipment info by tracking number
+        packages = shipment_info.join(charge_totals, how="left").reset_index()
 
         return packages
 
+    @staticmethod
+    def _first_by_tracking(
+        rows: pd.DataFrame, single_rows: bool, spec: dict[str, str]
+    ) -> pd.DataFrame:
+        """First value of each spec column per tracking number."""
+        if single_rows:
+            return rows.set_index("tracking_number")[list(spec)]
+        return rows.groupby("tracking_number", observed=True, sort=False).agg(spec)
+
     def get_charge_breakdown(self) -> pd.DataFrame:
         """Get charges broken down by category.
 
@@ -428,17 +656,19 @@ class UPSInvoiceParser:
 
         df = self.parsed_data
 
-        breakdown = (
-            df.groupby(["charge_category", "charge_category_name"])
-            .agg(
-                {
-                    "discount_amount": "sum",
-                    "net_amount": "sum",
-                    "total_charge": "sum",
-                    "tracking_number": "nunique",
-                }
-            )
-            .reset_index()
+        # Ordered by total below, so skip sorting the group keys
+        breakdown = df.groupby(
+            ["charge_category", "charge_category_name"],
+            observed=True,
+            sort=False,
+            as_index=False,
+        ).agg(
+            {
+                "discount_amount": "sum",
+                "net_amount": "sum",
+                "total_charge": "sum",
+                "tracking_number": "nunique",
+            }
         )
 
         breakdown.columns = [
@@ -453,6 +683,185 @@ class UPSInvoiceParser:
         return breakdown.sort_values("total_charge", ascending=False)
 
 
+class InvoiceCache:
+    """Parquet cache of parsed invoices stored next to the source CSVs.
+
+    Entries are keyed on file name, mtime and size, so an edited or replaced
+    CSV is reparsed. A manifest maps each source file to its current entry
+    so stale entries can be evicted. Requires pyarrow; without it every
+    load parses the CSV.
+    """
+
+    # Bump when parser output changes to invalidate existing entries
+    VERSION = 6
+
+    def __init__(self, folder: str | Path, cache_dir: str = ".cache"):
+        self.folder = Path(folder)
+        self.cache_dir = self.folder / cache_dir
+        self.manifest_path = self.cache_dir / "manifest.json"
+        self._lock = threading.Lock()
+        try:
+            self._manifest: dict[str, str] = json.loads(self.manifest_path.read_text())
+        except (OSError, ValueError):
+            self._manifest = {}
+
+    def _key(self, csv_path: Path) -> str:
+        stat = csv_path.stat()
+        raw = f"{csv_path.name}|{stat.st_mtime_ns}|{stat.st_size}|{self.VERSION}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def load(self, csv_path: str | Path) -> pd.DataFrame:
+        """Load a parsed invoice, reading the cache or parsing the CSV on a miss.
+
+        Safe to call from several threads; call save() afterwards to persist
+        the manifest and evict stale entries.
+        """
+        csv_path = Path(csv_path)
+        if not HAS_PYARROW:
+            with open(csv_path, "rb") as f:
+                return UPSInvoiceParser().parse_file(f, csv_path.name)
+
+        key = self._key(csv_path)
+        cached = self.cache_dir / f"{key}.parquet"
+        df = None
+        if cached.exists():
+            try:
+                df = _restore_strings(pd.read_parquet(cached, engine="pyarrow"))
+            except Exception:
+                df = None
+
+        if df is None:
+            with open(csv_path, "rb") as f:
+                df = UPSInvoiceParser().parse_file(f, csv_path.name)
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                df.to_parquet(cached, engine="pyarrow", compression="zstd")
+            except Exception:
+                # The cache is best-effort; a read-only folder just means no cache
+                pass
+
+        with self._lock:
+            self._manifest[csv_path.name] = key
+        return df
+
+    def save(self) -> None:
+        """Write the manifest and delete entries no longer referenced by it."""
+        if not self.cache_dir.exists():
+            return
+        with self._lock:
+            self._manifest = {
+                name: key
+                for name, key in self._manifest.items()
+                if (self.folder / name).exists()
+            }
+            live = set(self._manifest.values())
+            try:
+                for entry in self.cache_dir.glob("*.parquet"):
+                    if entry.stem not in live:
+                        entry.unlink()
+                self.manifest_path.write_text(json.dumps(self._manifest, indent=2))
+            except OSError:
+                pass
+
+
+def _restore_strings(df: pd.DataFrame) -> pd.DataFrame:
+    """Give string columns read back from parquet NaN for missing values.
+
+    pandas 2 reads ARROW_STRING_DTYPE columns back as ``string[pyarrow]``,
+    whose pd.NA cannot be tested for truth like the parsed frame's NaN.
+    """
+    if ARROW_STRING_DTYPE is None:
+        return df
+    columns = df.select_dtypes("string").columns
+    return df.astype(dict.fromkeys(columns, ARROW_STRING_DTYPE))
+
+
+def combine_invoices(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate parsed invoices into one compact, date-sorted DataFrame.
+
+    Rows are stably sorted by shipment_date (undated rows last) so date
+    bounds and range filters can use binary search. Categorical columns
+    from each file are merged with union_categoricals (plain concat would
+    fall back to object dtype), any remaining CATEGORY_COLUMNS are
+    converted, and weights are downcast to float32.
+
+    Args:
+        frames: DataFrames returned by UPSInvoiceParser.parse_file
+
+    Returns:
+        Combined DataFrame with optimized dtypes
+    """
+    combined = _concat_frames(frames)
+
+    if "shipment_date" in combined.columns:
+        combined = combined.sort_values(
+            "shipment_date", kind="mergesort", ignore_index=True
+        )
+
+    for col in CATEGORY_COLUMNS:
+        if col in combined.columns:
+            combined[col] = combined[col].astype("category")
+
+    for col in WEIGHT_COLUMNS:
+        if col in combined.columns:
+            combined[col] = pd.to_numeric(combined[col], downcast="float")
+
+    return combined
+
+
+def _max_workers(n_files: int) -> int:
+    """Thread count for loading n_files invoices concurrently."""
+    return max(1, min(8, n_files))
+
+
+def _sniff_encoding(sample: bytes) -> str:
+    """Guess a CSV's encoding from its first bytes.
+
+    A byte-order mark wins. Otherwise the sample must be valid UTF-8 (a
+    character cut off at the end of the sample is fine), else latin-1.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return "utf-8-sig"
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return "utf-16"
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=False)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8"
+
+
+def _concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate parsed frames, keeping their categoricals."""
+    columns = frames[0].columns
+    if all(df.columns.equals(columns) for df in frames[1:]):
+        # Build column by column, avoiding concat's alignment and block
+        # consolidation; NumPy columns are joined with one allocation each
+        return pd.DataFrame(
+            {col: _concat_column([df[col] for df in frames]) for col in columns}
+        )
+    return pd.concat(frames, ignore_index=True)
+
+
+def _concat_column(
+    parts: list[pd.Series],
+) -> np.ndarray | pd.Categorical | pd.Series:
+    """Concatenate one column from several frames."""
+    dtype = parts[0].dtype
+    if isinstance(dtype, pd.CategoricalDtype) and all(
+        isinstance(part.dtype, pd.CategoricalDtype) for part in parts
+    ):
+        # Sorted categories match what astype("category") would produce
+        return union_categoricals(parts, sort_categories=True)
+    if (
+        isinstance(dtype, np.dtype)
+        and dtype != object
+        and all(part.dtype == dtype for part in parts)
+    ):
+        return np.concatenate([part.to_numpy() for part in parts])
+    return pd.concat(parts, ignore_index=True)
+
+
 def load_invoices_from_folder(folder_path: str) -> pd.DataFrame:
     """Load all CSV invoices from a folder.
 
@@ -462,28 +871,31 @@ def load_invoices_from_folder(folder_path: str) -> pd.DataFrame:
     Returns:
         Combined DataFrame with all invoice data
     """
-    import os
-    from pathlib import Path
-
     folder = Path(folder_path)
     csv_files = list(folder.glob("*.csv"))
 
     if not csv_files:
         return pd.DataFrame()
 
-    parser = UPSInvoiceParser()
+    cache = InvoiceCache(folder)
     all_data = []
 
-    for csv_path in csv_files:
-        try:
-            with open(csv_path, "rb") as f:
-                df = parser.parse_file(f, csv_path.name)
-                all_data.append(df)
-        except Exception as e:
-            print(f"Error loading {csv_path.name}: {e}")
-            continue
+    # Files are independent, so load them concurrently; results are
+    # collected in glob order
+    with ThreadPoolExecutor(max_workers=_max_workers(len(csv_files))) as executor:
+        futures = [
+            (csv_path, executor.submit(cache.load, csv_path)) for csv_path in csv_files
+        ]
+        for csv_path, future in futures:
+            try:
+                all_data.append(future.result())
+            except Exception as e:
+                print(f"Error loading {csv_path.name}: {e}")
+                continue
+
+    cache.save()
 
     if not all_data:
         return pd.DataFrame()
 
-    return pd.concat(all_data, ignore_index=True)
+    return combine_invoices(all_data)
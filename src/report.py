@@ -3,10 +3,44 @@
 Generates PDF summary reports for UPS invoice analysis.
 """
 
-import io
+from collections.abc import Callable
 from datetime import datetime
+from typing import Any, BinaryIO
 from fpdf import FPDF
 
+# Cell formatters, bound once and shared by every table and metric
+FORMAT_AMOUNT = "{:,.2f} {}".format  # value, currency
+FORMAT_MONEY = "{:,.2f}".format
+FORMAT_MONEY_ROUNDED = "{:,.0f}".format
+FORMAT_COUNT = "{:,}".format
+FORMAT_WEIGHT = "{:,.1f}".format
+FORMAT_PERCENT = "{:.1f}%".format
+
+# Table layouts: column widths in mm and header labels
+COST_BREAKDOWN_WIDTHS = (60, 40, 40, 30)
+COST_BREAKDOWN_HEADERS = ("Charge Type", "Discount", "Net Amount", "% of Total")
+DESTINATION_WIDTHS = (40, 25, 35, 30, 30, 25)
+DESTINATION_HEADERS = (
+    "Country",
+    "Packages",
+    "Total Cost",
+    "Avg Cost",
+    "Weight (kg)",
+    "Return %",
+)
+RETURN_TYPES_WIDTHS = (100, 30, 40)
+RETURN_TYPES_HEADERS = ("Type", "Count", "Total Cost")
+TOP_EXPENSES_WIDTHS = (35, 25, 30, 30, 25, 25, 20)
+TOP_EXPENSES_HEADERS = (
+    "Tracking #",
+    "Reference",
+    "Recipient",
+    "City",
+    "Country",
+    "Service",
+    "Cost",
+)
+
 
 class PDFReportGenerator:
     """Generate PDF reports from invoice analysis."""
@@ -14,31 +48,55 @@ class PDFReportGenerator:
     def __init__(self):
         self.pdf = None
 
-    def generate_report(self, analyzer, charts: dict | None = None) -> bytes:
+    def generate_report(
+        self, analyzer, charts: dict | None = None, out: BinaryIO | None = None
+    ) -> bytes | None:
         """Generate a PDF report from analyzer data.
 
         Args:
             analyzer: InvoiceAnalyzer instance with data
-            charts: Optional dict of Plotly figures to include
+            charts: Accepted for compatibility; charts are not rendered
+                into the PDF
+            out: Optional binary stream to write the PDF to, skipping the
+                copy into a bytes object
 
         Returns:
-            PDF content as bytes
+            PDF content as bytes, or None when written to ``out``
         """
         self.pdf = FPDF()
         self.pdf.set_auto_page_break(auto=True, margin=15)
+        # One clock reading serves both the document metadata and the
+        # title page, so the two always agree
+        generated_at = datetime.now().astimezone()
+        self.pdf.set_creation_date(generated_at)
 
         # Add pages
-        self._add_title_page(analyzer)
-        self._add_summary_page(analyzer)
-        self._add_cost_breakdown_page(analyzer)
-        self._add_destination_page(analyzer)
-        self._add_returns_page(analyzer)
-        self._add_top_expenses_page(analyzer)
+        summary = analyzer.get_summary()
+        self._add_title_page(summary, generated_at.strftime("%Y-%m-%d %H:%M"))
+        self._add_summary_page(summary)
+        # Sections without data are noted together on one page rather than
+        # each getting a near-empty page of its own
+        unavailable = [
+            message
+            for message in (
+                self._add_cost_breakdown_page(analyzer),
+                self._add_destination_page(analyzer),
+                self._add_returns_page(analyzer),
+                self._add_top_expenses_page(analyzer),
+            )
+            if message
+        ]
+        if unavailable:
+            self._add_unavailable_page(unavailable)
+
+        if out is not None:
+            self.pdf.output(out)
+            return None
 
         # Output to bytes
         return bytes(self.pdf.output())
 
-    def _add_title_page(self, analyzer):
+    def _add_title_page(self, summary, generated_at: str):
         """Add title page."""
         self.pdf.add_page()
         self.pdf.set_font("Helvetica", "B", 28)
@@ -55,7 +113,6 @@ class PDFReportGenerator:
         )
 
         # Subtitle with date range
-        summary = analyzer.get_summary()
         self.pdf.set_font("Helvetica", "", 14)
 
         if summary.date_range:
@@ -73,28 +130,27 @@ class PDFReportGenerator:
         self.pdf.cell(
             0,
             10,
-            f"Generated on {datetime.now().strftime('%Y-%m-%d %H:%M')}",
+            f"Generated on {generated_at}",
             align="C",
         )
 
-    def _add_summary_page(self, analyzer):
+    def _add_summary_page(self, summary):
         """Add summary statistics page."""
         self.pdf.add_page()
-        summary = analyzer.get_summary()
 
         self._add_section_title("Executive Summary")
 
         # Key metrics table
         metrics = [
-            ("Total Cost", f"{summary.total_cost:,.2f} {summary.currency}"),
-            ("Total Packages", f"{summary.total_packages:,}"),
+            ("Total Cost", FORMAT_AMOUNT(summary.total_cost, summary.currency)),
+            ("Total Packages", FORMAT_COUNT(summary.total_packages)),
             ("Total Invoices", f"{summary.total_invoices}"),
             (
                 "Average Cost per Package",
-                f"{summary.avg_cost_per_package:,.2f} {summary.currency}",
+                FORMAT_AMOUNT(summary.avg_cost_per_package, summary.currency),
             ),
-            ("Total Weight", f"{summary.total_weight_kg:,.1f} kg"),
-            ("Return Rate", f"{summary.return_rate:.1f}%"),
+            ("Total Weight", FORMAT_WEIGHT(summary.total_weight_kg) + " kg"),
+            ("Return Rate", FORMAT_PERCENT(summary.return_rate)),
         ]
 
         self._add_metrics_table(metrics)
@@ -104,136 +160,109 @@ class PDFReportGenerator:
         self._add_section_title("Cost Components", level=2)
 
         cost_breakdown = [
-            ("Freight Charges", f"{summary.total_freight:,.2f} {summary.currency}"),
+            ("Freight Charges", FORMAT_AMOUNT(summary.total_freight, summary.currency)),
             (
                 "Fuel Surcharges",
-                f"{summary.total_fuel_surcharge:,.2f} {summary.currency}",
+                FORMAT_AMOUNT(summary.total_fuel_surcharge, summary.currency),
             ),
-            ("Tax (VAT)", f"{summary.total_tax:,.2f} {summary.currency}"),
+            ("Tax (VAT)", FORMAT_AMOUNT(summary.total_tax, summary.currency)),
             (
                 "Accessorial Charges",
-                f"{summary.total_accessorial:,.2f} {summary.currency}",
+                FORMAT_AMOUNT(summary.total_accessorial, summary.currency),
             ),
         ]
 
         self._add_metrics_table(cost_breakdown)
 
-    def _add_cost_breakdown_page(self, analyzer):
-        """Add detailed cost breakdown page."""
-        self.pdf.add_page()
-        self._add_section_title("Cost Breakdown by Charge Type")
-
+    def _add_cost_breakdown_page(self, analyzer) -> str | None:
+        """Add detailed cost breakdown page, or return why it was skipped."""
         breakdown = analyzer.analyze_cost_breakdown()
         if breakdown.empty:
-            self.pdf.set_font("Helvetica", "I", 10)
-            self.pdf.cell(0, 10, "No cost data available")
-            return
+            return "No cost data available"
+
+        self.pdf.add_page()
+        self._add_section_title("Cost Breakdown by Charge Type")
 
         # Table header
         self.pdf.set_font("Helvetica", "B", 10)
-        col_widths = [60, 40, 40, 30]
-        headers = ["Charge Type", "Discount", "Net Amount", "% of Total"]
-
-        for i, header in enumerate(headers):
-            self.pdf.cell(col_widths[i], 8, header, border=1, align="C")
-        self.pdf.ln()
+        self._add_table_row(COST_BREAKDOWN_WIDTHS, COST_BREAKDOWN_HEADERS, 8, "C")
 
         # Table rows
         self.pdf.set_font("Helvetica", "", 10)
-        summary = analyzer.get_summary()
-
-        for _, row in breakdown.iterrows():
-            self.pdf.cell(
-                col_widths[0], 7, str(row["charge_category_name"])[:30], border=1
-            )
-            self.pdf.cell(
-                col_widths[1], 7, f"{row['discount_amount']:,.2f}", border=1, align="R"
-            )
-            self.pdf.cell(
-                col_widths[2], 7, f"{row['net_amount']:,.2f}", border=1, align="R"
-            )
-            self.pdf.cell(
-                col_widths[3], 7, f"{row['percentage']:.1f}%", border=1, align="R"
-            )
-            self.pdf.ln()
 
-    def _add_destination_page(self, analyzer):
-        """Add destination analysis page."""
-        self.pdf.add_page()
-        self._add_section_title("Shipping by Destination")
+        rows = self._rows(
+            breakdown,
+            [
+                ("charge_category_name", lambda name: str(name)[:30]),
+                ("discount_amount", FORMAT_MONEY),
+                ("net_amount", FORMAT_MONEY),
+                ("percentage", FORMAT_PERCENT),
+            ],
+        )
+        for row in rows:
+            self._add_table_row(COST_BREAKDOWN_WIDTHS, row, 7, ("L", "R", "R", "R"))
 
+    def _add_destination_page(self, analyzer) -> str | None:
+        """Add destination analysis page, or return why it was skipped."""
         by_country = analyzer.analyze_by_destination()
         if by_country.empty:
-            self.pdf.set_font("Helvetica", "I", 10)
-            self.pdf.cell(0, 10, "No destination data available")
-            return
+            return "No destination data available"
+
+        self.pdf.add_page()
+        self._add_section_title("Shipping by Destination")
 
         # Show top 15 destinations
         top_countries = by_country.head(15)
 
         # Table header
         self.pdf.set_font("Helvetica", "B", 9)
-        col_widths = [40, 25, 35, 30, 30, 25]
-        headers = [
-            "Country",
-            "Packages",
-            "Total Cost",
-            "Avg Cost",
-            "Weight (kg)",
-            "Return %",
-        ]
-
-        for i, header in enumerate(headers):
-            self.pdf.cell(col_widths[i], 8, header, border=1, align="C")
-        self.pdf.ln()
+        self._add_table_row(DESTINATION_WIDTHS, DESTINATION_HEADERS, 8, "C")
 
         # Table rows
         self.pdf.set_font("Helvetica", "", 9)
-        summary = analyzer.get_summary()
 
-        for _, row in top_countries.iterrows():
-            country_name = str(row.get("country_name", row["country_code"]))[:20]
-            self.pdf.cell(col_widths[0], 7, country_name, border=1)
-            self.pdf.cell(
-                col_widths[1], 7, f"{row['package_count']:,}", border=1, align="R"
-            )
-            self.pdf.cell(
-                col_widths[2], 7, f"{row['total_cost']:,.2f}", border=1, align="R"
-            )
-            self.pdf.cell(
-                col_widths[3],
-                7,
-                f"{row['avg_cost_per_package']:,.2f}",
-                border=1,
-                align="R",
-            )
-            self.pdf.cell(
-                col_widths[4], 7, f"{row['total_weight']:,.1f}", border=1, align="R"
-            )
-            self.pdf.cell(
-                col_widths[5], 7, f"{row['return_rate']:.1f}%", border=1, align="R"
+        name_column = (
+            "country_name" if "country_name" in top_countries else "country_code"
+        )
+        rows = self._rows(
+            top_countries,
+            [
+                (name_column, lambda name: str(name)[:20]),
+                ("package_count", FORMAT_COUNT),
+                ("total_cost", FORMAT_MONEY),
+                ("avg_cost_per_package", FORMAT_MONEY),
+                ("total_weight", FORMAT_WEIGHT),
+                ("return_rate", FORMAT_PERCENT),
+            ],
+        )
+        for row in rows:
+            self._add_table_row(
+                DESTINATION_WIDTHS, row, 7, ("L", "R", "R", "R", "R", "R")
             )
-            self.pdf.ln()
-
-    def _add_returns_page(self, analyzer):
-        """Add returns analysis page."""
-        self.pdf.add_page()
-        self._add_section_title("Return Shipments Analysis")
 
+    def _add_returns_page(self, analyzer) -> str | None:
+        """Add returns analysis page, or return why it was skipped."""
         returns_data = analyzer.analyze_returns()
         summary_data = returns_data.get("summary", {})
 
         if not summary_data:
-            self.pdf.set_font("Helvetica", "I", 10)
-            self.pdf.cell(0, 10, "No return shipments in data")
-            return
+            return "No return shipments in data"
+
+        self.pdf.add_page()
+        self._add_section_title("Return Shipments Analysis")
 
         # Return summary metrics
         metrics = [
-            ("Total Returns", f"{summary_data.get('total_returns', 0):,}"),
-            ("Total Return Cost", f"{summary_data.get('total_return_cost', 0):,.2f}"),
-            ("Return Rate", f"{summary_data.get('return_rate', 0):.1f}%"),
-            ("Average Return Cost", f"{summary_data.get('avg_return_cost', 0):,.2f}"),
+            ("Total Returns", FORMAT_COUNT(summary_data.get("total_returns", 0))),
+            (
+                "Total Return Cost",
+                FORMAT_MONEY(summary_data.get("total_return_cost", 0)),
+            ),
+            ("Return Rate", FORMAT_PERCENT(summary_data.get("return_rate", 0))),
+            (
+                "Average Return Cost",
+                FORMAT_MONEY(summary_data.get("avg_return_cost", 0)),
+            ),
         ]
         self._add_metrics_table(metrics)
 
@@ -244,94 +273,93 @@ class PDFReportGenerator:
             self._add_section_title("Return Types", level=2)
 
             self.pdf.set_font("Helvetica", "B", 9)
-            col_widths = [100, 30, 40]
-            headers = ["Type", "Count", "Total Cost"]
-
-            for i, header in enumerate(headers):
-                self.pdf.cell(col_widths[i], 8, header, border=1, align="C")
-            self.pdf.ln()
+            self._add_table_row(RETURN_TYPES_WIDTHS, RETURN_TYPES_HEADERS, 8, "C")
 
             self.pdf.set_font("Helvetica", "", 9)
-            for _, row in by_reason.head(10).iterrows():
-                reason_text = str(row["reason"])[:55] if row["reason"] else "Unknown"
-                self.pdf.cell(col_widths[0], 7, reason_text, border=1)
-                self.pdf.cell(
-                    col_widths[1], 7, f"{row['count']:,}", border=1, align="R"
-                )
-                self.pdf.cell(
-                    col_widths[2], 7, f"{row['total_cost']:,.2f}", border=1, align="R"
-                )
-                self.pdf.ln()
-
-    def _add_top_expenses_page(self, analyzer):
-        """Add top expenses page."""
-        self.pdf.add_page()
-        self._add_section_title("Most Expensive Shipments")
+            rows = self._rows(
+                by_reason.head(10),
+                [
+                    (
+                        "reason",
+                        lambda reason: str(reason)[:55] if reason else "Unknown",
+                    ),
+                    ("count", FORMAT_COUNT),
+                    ("total_cost", FORMAT_MONEY),
+                ],
+            )
+            for row in rows:
+                self._add_table_row(RETURN_TYPES_WIDTHS, row, 7, ("L", "R", "R"))
 
+    def _add_top_expenses_page(self, analyzer) -> str | None:
+        """Add top expenses page, or return why it was skipped."""
         top_expenses = analyzer.get_top_expenses(n=15)
         if top_expenses.empty:
-            self.pdf.set_font("Helvetica", "I", 10)
-            self.pdf.cell(0, 10, "No shipment data available")
-            return
+            return "No shipment data available"
+
+        self.pdf.add_page()
+        self._add_section_title("Most Expensive Shipments")
 
         # Simplified table for top expenses
         self.pdf.set_font("Helvetica", "B", 8)
-        col_widths = [35, 25, 30, 30, 25, 25, 20]
-        headers = [
-            "Tracking #",
-            "Reference",
-            "Recipient",
-            "City",
-            "Country",
-            "Service",
-            "Cost",
-        ]
-
-        for i, header in enumerate(headers):
-            self.pdf.cell(col_widths[i], 7, header, border=1, align="C")
-        self.pdf.ln()
+        self._add_table_row(TOP_EXPENSES_WIDTHS, TOP_EXPENSES_HEADERS, 7, "C")
 
         self.pdf.set_font("Helvetica", "", 8)
-        for _, row in top_expenses.iterrows():
-            tracking = (
-                str(row.get("tracking_number", ""))[-12:]
-                if row.get("tracking_number")
-                else ""
-            )
-            ref = (
-                str(row.get("order_reference", ""))[:12]
-                if row.get("order_reference")
-                else ""
-            )
-            recipient = (
-                str(row.get("recipient_name", ""))[:15]
-                if row.get("recipient_name")
-                else ""
-            )
-            city = (
-                str(row.get("recipient_city", ""))[:15]
-                if row.get("recipient_city")
-                else ""
-            )
-            country = (
-                str(row.get("recipient_country", ""))[:5]
-                if row.get("recipient_country")
-                else ""
-            )
-            service = (
-                str(row.get("service_name", ""))[:12] if row.get("service_name") else ""
+        rows = self._rows(
+            top_expenses,
+            [
+                ("tracking_number", lambda value: str(value)[-12:] if value else ""),
+                ("order_reference", lambda value: str(value)[:12] if value else ""),
+                ("recipient_name", lambda value: str(value)[:15] if value else ""),
+                ("recipient_city", lambda value: str(value)[:15] if value else ""),
+                ("recipient_country", lambda value: str(value)[:5] if value else ""),
+                ("service_name", lambda value: str(value)[:12] if value else ""),
+                ("total_charge", FORMAT_MONEY_ROUNDED),
+            ],
+        )
+        for row in rows:
+            self._add_table_row(
+                TOP_EXPENSES_WIDTHS, row, 6, ("L", "L", "L", "L", "C", "L", "R")
             )
 
-            self.pdf.cell(col_widths[0], 6, tracking, border=1)
-            self.pdf.cell(col_widths[1], 6, ref, border=1)
-            self.pdf.cell(col_widths[2], 6, recipient, border=1)
-            self.pdf.cell(col_widths[3], 6, city, border=1)
-            self.pdf.cell(col_widths[4], 6, country, border=1, align="C")
-            self.pdf.cell(col_widths[5], 6, service, border=1)
-            self.pdf.cell(
-                col_widths[6], 6, f"{row['total_charge']:,.0f}", border=1, align="R"
-            )
-            self.pdf.ln()
+    def _add_unavailable_page(self, messages: list[str]):
+        """Add one page listing the sections skipped for lack of data."""
+        self.pdf.add_page()
+        self._add_section_title("Sections Without Data")
+        self.pdf.set_font("Helvetica", "I", 10)
+        for message in messages:
+            self.pdf.cell(0, 8, message, new_x="LMARGIN", new_y="NEXT")
+
+    @staticmethod
+    def _rows(df, formats: list[tuple[str, Callable[[Any], str]]]):
+        """Iterate table rows as tuples of formatted cell text.
+
+        Each (column, format) pair formats its whole column up front, so the
+        drawing loop only places strings. Columns missing from df are
+        formatted as blanks.
+        """
+        # Helvetica is a core font limited to latin-1, and fpdf2 raises on
+        # anything else; such characters are replaced with "?" here instead
+        cells = [
+            [
+                fmt(value).encode("latin-1", "replace").decode("latin-1")
+                for value in (df[col].to_numpy() if col in df else [""] * len(df))
+            ]
+            for col, fmt in formats
+        ]
+        return zip(*cells)
+
+    def _add_table_row(
+        self,
+        col_widths: tuple[int, ...],
+        cells,
+        height: int,
+        align: str | tuple[str, ...] = "L",
+    ):
+        """Draw one bordered table row; align is shared or given per cell."""
+        aligns = [align] * len(col_widths) if isinstance(align, str) else align
+        for width, text, cell_align in zip(col_widths, cells, aligns):
+            self.pdf.cell(width, height, text, border=1, align=cell_align)
+        self.pdf.ln()
 
     def _add_section_title(self, title: str, level: int = 1):
         """Add a section title."""
@@ -340,8 +368,9 @@ class PDFReportGenerator:
             self.pdf.set_text_color(53, 28, 21)  # UPS Brown
             self.pdf.cell(0, 12, title, new_x="LMARGIN", new_y="NEXT")
             self.pdf.set_draw_color(53, 28, 21)
-            self.pdf.line(10, self.pdf.get_y(), 200, self.pdf.get_y())
-            self.pdf.set_y(self.pdf.get_y() + 5)
+            y = self.pdf.get_y()
+            self.pdf.line(10, y, 200, y)
+            self.pdf.set_y(y + 5)
         else:
             self.pdf.set_font("Helvetica", "B", 12)
             self.pdf.set_text_color(0, 0, 0)
@@ -351,8 +380,8 @@ class PDFReportGenerator:
 
     def _add_metrics_table(self, metrics: list[tuple[str, str]]):
         """Add a two-column metrics table."""
-        self.pdf.set_font("Helvetica", "", 11)
-
+        # Labels are regular and values bold; fpdf2 itself skips set_font
+        # calls that would not change the font
         for label, value in metrics:
             self.pdf.set_font("Helvetica", "", 11)
             self.pdf.cell(80, 8, label + ":", border=0)
@@ -3,10 +3,13 @@
 Creates Plotly charts for UPS invoice analysis.
 """
 
+from collections.abc import Mapping
+from types import MappingProxyType
+
+import numpy as np
 import pandas as pd
-import plotly.express as px
 import plotly.graph_objects as go
-from plotly.subplots import make_subplots
+from plotly.colors import qualitative
 
 try:
     import pycountry
@@ -16,15 +19,12 @@ except ImportError:
     HAS_PYCOUNTRY = False
 
 
-def _alpha2_to_alpha3(code: str) -> str | None:
-    """Convert ISO alpha-2 country code to alpha-3."""
-    if not HAS_PYCOUNTRY or not code:
-        return None
-    try:
-        country = pycountry.countries.get(alpha_2=code)
-        return country.alpha_3 if country else None
-    except Exception:
-        return None
+# ISO alpha-2 -> alpha-3 codes for the choropleth, built once at import
+ALPHA3_CODES: Mapping[str, str] = MappingProxyType(
+    {country.alpha_2: country.alpha_3 for country in pycountry.countries}
+    if HAS_PYCOUNTRY
+    else {}
+)
 
 
 # Color palette
@@ -40,6 +40,33 @@ COLORS = {
     "other": "#7B6B63",
 }
 
+# Fallback colors for categories missing from a color map (Plotly's default)
+DEFAULT_SEQUENCE = qualitative.Plotly
+
+# Layout settings shared by charts of the same kind; titles are added per chart
+PIE_LAYOUT = dict(
+    legend=dict(orientation="h", yanchor="bottom", y=-0.2),
+    margin=dict(t=60, b=80, l=20, r=20),
+)
+COUNTRY_BAR_LAYOUT = dict(
+    xaxis_title="",
+    xaxis_tickangle=-45,
+    margin=dict(t=60, b=100, l=60, r=20),
+)
+TREND_LAYOUT = dict(
+    # Leaves room on the right for the secondary axis (yaxis2)
+    xaxis=dict(title="Period", domain=[0, 0.94]),
+    legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+    margin=dict(t=80, b=40, l=60, r=60),
+    hovermode="x unified",
+)
+
+# Weight scatter: above SCATTER_MAX_POINTS packages, all of them are drawn as a
+# density grid and only the largest weight differences as individual points
+SCATTER_MAX_POINTS = 1000
+SCATTER_EXTREME_POINTS = 100
+SCATTER_DENSITY_BINS = 60
+
 CHARGE_COLORS = {
     "Freight": COLORS["freight"],
     "Fuel Surcharge": COLORS["fuel"],
@@ -56,29 +83,20 @@ def create_cost_breakdown_pie(breakdown_df: pd.DataFrame) -> go.Figure:
     if breakdown_df.empty:
         return _empty_chart("No data available")
 
-    fig = px.pie(
-        breakdown_df,
-        values="total_charge",
-        names="charge_category_name",
-        title="Cost Breakdown by Charge Type",
-        color="charge_category_name",
-        color_discrete_map=CHARGE_COLORS,
-        hole=0.4,
-    )
-
-    fig.update_traces(
-        textposition="inside",
-        textinfo="percent+label",
-        hovertemplate="<b>%{label}</b><br>Amount: %{value:,.2f}<br>Percentage: %{percent}<extra></extra>",
-    )
-
-    fig.update_layout(
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2),
-        margin=dict(t=60, b=80, l=20, r=20),
+    names = breakdown_df["charge_category_name"].to_numpy()
+    return go.Figure(
+        go.Pie(
+            labels=names,
+            values=breakdown_df["total_charge"].to_numpy(),
+            marker_colors=_discrete_colors(names, CHARGE_COLORS),
+            hole=0.4,
+            textposition="inside",
+            textinfo="percent+label",
+            hovertemplate="<b>%{label}</b><br>Amount: %{value:,.2f}<br>Percentage: %{percent}<extra></extra>",
+        ),
+        layout=dict(title="Cost Breakdown by Charge Type", **PIE_LAYOUT),
     )
 
-    return fig
-
 
 def create_cost_breakdown_bar(
     breakdown_df: pd.DataFrame, currency: str = "EUR"
@@ -87,83 +105,76 @@ def create_cost_breakdown_bar(
     if breakdown_df.empty:
         return _empty_chart("No data available")
 
-    fig = px.bar(
-        breakdown_df,
-        x="charge_category_name",
-        y="total_charge",
-        title="Costs by Charge Category",
-        color="charge_category_name",
-        color_discrete_map=CHARGE_COLORS,
-        text="total_charge",
-    )
-
-    fig.update_traces(
-        texttemplate="%{text:,.0f}",
-        textposition="outside",
-        hovertemplate="<b>%{x}</b><br>Amount: %{y:,.2f} "
-        + currency
-        + "<extra></extra>",
-    )
-
-    fig.update_layout(
-        xaxis_title="",
-        yaxis_title=f"Total Cost ({currency})",
-        showlegend=False,
-        margin=dict(t=60, b=40, l=60, r=20),
+    names = breakdown_df["charge_category_name"].to_numpy()
+    totals = breakdown_df["total_charge"].to_numpy()
+    return go.Figure(
+        go.Bar(
+            x=names,
+            y=totals,
+            marker_color=_discrete_colors(names, CHARGE_COLORS),
+            text=totals,
+            texttemplate="%{text:,.0f}",
+            textposition="outside",
+            hovertemplate="<b>%{x}</b><br>Amount: %{y:,.2f} "
+            + currency
+            + "<extra></extra>",
+        ),
+        layout=dict(
+            title="Costs by Charge Category",
+            xaxis_title="",
+            yaxis_title=f"Total Cost ({currency})",
+            showlegend=False,
+            margin=dict(t=60, b=40, l=60, r=20),
+        ),
     )
 
-    return fig
-
 
 def create_destination_map(by_country_df: pd.DataFrame) -> go.Figure:
     """Create choropleth map showing shipping volume by country."""
     if by_country_df.empty:
         return _empty_chart("No destination data available")
 
-    # Make a copy to avoid modifying original
-    df = by_country_df.copy()
-
     # Convert alpha-2 to alpha-3 codes for Plotly choropleth
+    locations = by_country_df["country_code"].astype(object)
     if HAS_PYCOUNTRY:
-        df["country_code_alpha3"] = df["country_code"].apply(_alpha2_to_alpha3)
-        # Filter out rows where conversion failed
-        df = df[df["country_code_alpha3"].notna()]
-        location_col = "country_code_alpha3"
-    else:
-        location_col = "country_code"
-
-    if df.empty:
-        return _empty_chart("No valid country data available")
+        locations = locations.map(ALPHA3_CODES)
 
-    fig = px.choropleth(
-        df,
-        locations=location_col,
-        color="package_count",
-        hover_name="country_name",
-        hover_data={
-            location_col: False,
-            "country_code": True,
-            "package_count": True,
-            "total_cost": ":.2f",
-            "avg_cost_per_package": ":.2f",
-        },
-        color_continuous_scale="YlOrBr",
-        title="Shipments by Destination Country",
-    )
+    # Filter out rows where conversion failed, taking only the plotted
+    # columns rather than copying the whole frame
+    valid = locations.notna().to_numpy()
+    if not valid.any():
+        return _empty_chart("No valid country data available")
 
-    fig.update_layout(
-        geo=dict(
-            showframe=False,
-            showcoastlines=True,
-            projection_type="natural earth",
-            showland=True,
-            landcolor="rgb(243, 243, 243)",
+    hover = by_country_df[["country_code", "total_cost", "avg_cost_per_package"]]
+    return go.Figure(
+        go.Choropleth(
+            locations=locations.to_numpy()[valid],
+            z=by_country_df["package_count"].to_numpy()[valid],
+            text=by_country_df["country_name"].to_numpy()[valid],
+            customdata=hover.to_numpy()[valid],
+            coloraxis="coloraxis",
+            hovertemplate=(
+                "<b>%{text}</b><br><br>"
+                "country_code=%{customdata[0]}<br>"
+                "package_count=%{z}<br>"
+                "total_cost=%{customdata[1]:.2f}<br>"
+                "avg_cost_per_package=%{customdata[2]:.2f}<extra></extra>"
+            ),
+        ),
+        layout=dict(
+            title="Shipments by Destination Country",
+            coloraxis=dict(colorscale="YlOrBr", colorbar_title="package_count"),
+            geo=dict(
+                showframe=False,
+                showcoastlines=True,
+                projection_type="natural earth",
+                showland=True,
+                landcolor="rgb(243, 243, 243)",
+            ),
+            margin=dict(t=60, b=20, l=20, r=20),
         ),
-        margin=dict(t=60, b=20, l=20, r=20),
     )
 
-    return fig
-
 
 def create_destination_bar(
     by_country_df: pd.DataFrame, top_n: int = 15, currency: str = "EUR"
@@ -172,81 +183,65 @@ def create_destination_bar(
     if by_country_df.empty:
         return _empty_chart("No destination data available")
 
-    top_countries = by_country_df.head(top_n)
+    top_countries = by_country_df.nlargest(top_n, "total_cost")
 
-    fig = go.Figure()
-
-    fig.add_trace(
+    return go.Figure(
         go.Bar(
-            x=top_countries["country_name"],
-            y=top_countries["total_cost"],
+            x=top_countries["country_name"].to_numpy(),
+            y=top_countries["total_cost"].to_numpy(),
             name="Total Cost",
             marker_color=COLORS["primary"],
-            text=top_countries["package_count"].apply(lambda x: f"{x} pkgs"),
+            text=top_countries["package_count"].to_numpy(),
+            texttemplate="%{text} pkgs",
             textposition="outside",
             hovertemplate=(
                 "<b>%{x}</b><br>"
                 f"Cost: %{{y:,.2f}} {currency}<br>"
                 "Packages: %{text}<extra></extra>"
             ),
-        )
-    )
-
-    fig.update_layout(
-        title=f"Top {top_n} Destinations by Cost",
-        xaxis_title="",
-        yaxis_title=f"Total Cost ({currency})",
-        xaxis_tickangle=-45,
-        margin=dict(t=60, b=100, l=60, r=20),
+        ),
+        layout=dict(
+            title=f"Top {top_n} Destinations by Cost",
+            yaxis_title=f"Total Cost ({currency})",
+            **COUNTRY_BAR_LAYOUT,
+        ),
     )
 
-    return fig
-
 
 def create_trend_chart(trends_df: pd.DataFrame, currency: str = "EUR") -> go.Figure:
     """Create line chart showing cost and volume trends over time."""
     if trends_df.empty:
         return _empty_chart("No trend data available")
 
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Scatter(
-            x=trends_df["period"],
-            y=trends_df["total_cost"],
-            name="Total Cost",
-            line=dict(color=COLORS["primary"], width=3),
-            mode="lines+markers",
-            hovertemplate=f"Cost: %{{y:,.2f}} {currency}<extra></extra>",
-        ),
-        secondary_y=False,
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=trends_df["period"],
-            y=trends_df["package_count"],
-            name="Package Count",
-            line=dict(color=COLORS["secondary"], width=3, dash="dash"),
-            mode="lines+markers",
-            hovertemplate="Packages: %{y}<extra></extra>",
+    periods = trends_df["period"].to_numpy()
+    return go.Figure(
+        [
+            go.Scatter(
+                x=periods,
+                y=trends_df["total_cost"].to_numpy(),
+                name="Total Cost",
+                line=dict(color=COLORS["primary"], width=3),
+                mode="lines+markers",
+                hovertemplate=f"Cost: %{{y:,.2f}} {currency}<extra></extra>",
+            ),
+            go.Scatter(
+                x=periods,
+                y=trends_df["package_count"].to_numpy(),
+                name="Package Count",
+                line=dict(color=COLORS["secondary"], width=3, dash="dash"),
+                mode="lines+markers",
+                hovertemplate="Packages: %{y}<extra></extra>",
+                yaxis="y2",
+            ),
+        ],
+        layout=dict(
+            title="Cost and Volume Trends Over Time",
+            yaxis_title=f"Total Cost ({currency})",
+            yaxis2=dict(title="Package Count", overlaying="y", side="right"),
+            **TREND_LAYOUT,
         ),
-        secondary_y=True,
-    )
-
-    fig.update_layout(
-        title="Cost and Volume Trends Over Time",
-        xaxis_title="Period",
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        margin=dict(t=80, b=40, l=60, r=60),
-        hovermode="x unified",
     )
 
-    fig.update_yaxes(title_text=f"Total Cost ({currency})", secondary_y=False)
-    fig.update_yaxes(title_text="Package Count", secondary_y=True)
-
-    return fig
-
 
 def create_return_reasons_chart(by_reason_df: pd.DataFrame) -> go.Figure:
     """Create horizontal bar chart showing return types.
@@ -257,115 +252,152 @@ def create_return_reasons_chart(by_reason_df: pd.DataFrame) -> go.Figure:
     if by_reason_df.empty:
         return _empty_chart("No return data available")
 
-    # Truncate long reason texts
-    by_reason_df = by_reason_df.copy()
-    by_reason_df["reason_short"] = by_reason_df["reason"].apply(
-        lambda x: x[:40] + "..." if isinstance(x, str) and len(x) > 40 else x
-    )
-
-    fig = px.bar(
-        by_reason_df.head(15),
-        y="reason_short",
-        x="count",
-        orientation="h",
-        title="Return Types",
-        color="total_cost",
-        color_continuous_scale="YlOrBr",
-        text="count",
-    )
+    top_reasons = by_reason_df.nlargest(15, "count")
 
-    fig.update_traces(
-        textposition="outside",
-        hovertemplate="<b>%{y}</b><br>Count: %{x}<br>Cost: %{marker.color:,.2f}<extra></extra>",
-    )
+    # Truncate long reason texts
+    reasons = top_reasons["reason"].astype(str)
+    reasons = reasons.where(reasons.str.len() <= 40, reasons.str[:40] + "...")
 
-    fig.update_layout(
-        xaxis_title="Number of Returns",
-        yaxis_title="",
-        yaxis=dict(autorange="reversed"),
-        margin=dict(t=60, b=40, l=200, r=40),
-        coloraxis_colorbar_title="Cost",
+    return go.Figure(
+        go.Bar(
+            y=reasons.to_numpy(),
+            x=top_reasons["count"].to_numpy(),
+            orientation="h",
+            marker=dict(
+                color=top_reasons["total_cost"].to_numpy(), coloraxis="coloraxis"
+            ),
+            text=top_reasons["count"].to_numpy(),
+            textposition="outside",
+            hovertemplate="<b>%{y}</b><br>Count: %{x}<br>Cost: %{marker.color:,.2f}<extra></extra>",
+        ),
+        layout=dict(
+            title="Return Types",
+            coloraxis_colorscale="YlOrBr",
+            xaxis_title="Number of Returns",
+            yaxis_title="",
+            yaxis=dict(autorange="reversed"),
+            margin=dict(t=60, b=40, l=200, r=40),
+            coloraxis_colorbar_title="Cost",
+        ),
     )
 
-    return fig
-
 
 def create_weight_distribution(distribution_df: pd.DataFrame) -> go.Figure:
     """Create bar chart showing package weight distribution."""
     if distribution_df.empty:
         return _empty_chart("No weight data available")
 
-    fig = px.bar(
-        distribution_df,
-        x="weight_range",
-        y="package_count",
-        title="Package Weight Distribution",
-        color="total_cost",
-        color_continuous_scale="YlOrBr",
-        text="package_count",
-    )
-
-    fig.update_traces(
-        textposition="outside",
-        hovertemplate=(
-            "<b>%{x}</b><br>"
-            "Packages: %{y}<br>"
-            "Total Cost: %{marker.color:,.2f}<extra></extra>"
+    counts = distribution_df["package_count"].to_numpy()
+    return go.Figure(
+        go.Bar(
+            x=distribution_df["weight_range"].to_numpy(),
+            y=counts,
+            marker=dict(
+                color=distribution_df["total_cost"].to_numpy(), coloraxis="coloraxis"
+            ),
+            text=counts,
+            textposition="outside",
+            hovertemplate=(
+                "<b>%{x}</b><br>"
+                "Packages: %{y}<br>"
+                "Total Cost: %{marker.color:,.2f}<extra></extra>"
+            ),
+        ),
+        layout=dict(
+            title="Package Weight Distribution",
+            coloraxis_colorscale="YlOrBr",
+            xaxis_title="Weight Range",
+            yaxis_title="Number of Packages",
+            margin=dict(t=60, b=40, l=60, r=40),
+            coloraxis_colorbar_title="Cost",
         ),
     )
 
-    fig.update_layout(
-        xaxis_title="Weight Range",
-        yaxis_title="Number of Packages",
-        margin=dict(t=60, b=40, l=60, r=40),
-        coloraxis_colorbar_title="Cost",
-    )
-
-    return fig
-
 
 def create_weight_scatter(weight_detail_df: pd.DataFrame) -> go.Figure:
-    """Create scatter plot comparing actual vs billed weight."""
+    """Create scatter plot comparing actual vs billed weight.
+
+    Large inputs are shown as a density grid over every package, with the
+    packages billed furthest from their actual weight plotted on top.
+    """
     if weight_detail_df.empty:
         return _empty_chart("No weight data available")
 
-    # Sample if too many points
     df = weight_detail_df
-    if len(df) > 1000:
-        df = df.sample(n=1000, random_state=42)
-
-    fig = px.scatter(
-        df,
-        x="actual_weight",
-        y="billed_weight",
-        title="Actual vs Billed Weight",
-        opacity=0.6,
-        color="weight_diff",
-        color_continuous_scale="RdYlGn_r",
-        hover_data=["tracking_number"],
-    )
-
-    # Add diagonal line (y=x)
-    max_val = max(df["actual_weight"].max(), df["billed_weight"].max())
-    fig.add_trace(
-        go.Scatter(
-            x=[0, max_val],
-            y=[0, max_val],
-            mode="lines",
-            name="Equal Weight Line",
-            line=dict(color="gray", dash="dash"),
+    traces = []
+    if len(df) > SCATTER_MAX_POINTS:
+        actual = df["actual_weight"].to_numpy(dtype=np.float64)
+        billed = df["billed_weight"].to_numpy(dtype=np.float64)
+        known = ~(np.isnan(actual) | np.isnan(billed))
+        counts, x_edges, y_edges = np.histogram2d(
+            actual[known], billed[known], bins=SCATTER_DENSITY_BINS
+        )
+        counts = counts.T
+        traces.append(
+            go.Heatmap(
+                x=(x_edges[:-1] + x_edges[1:]) / 2,
+                y=(y_edges[:-1] + y_edges[1:]) / 2,
+                # Empty cells stay transparent
+                z=np.where(counts > 0, counts, np.nan),
+                colorscale=[[0, COLORS["light"]], [1, COLORS["primary"]]],
+                showscale=False,
+                hovertemplate=(
+                    "actual_weight=%{x:.1f}<br>"
+                    "billed_weight=%{y:.1f}<br>"
+                    "packages=%{z}<extra></extra>"
+                ),
+            )
         )
-    )
 
-    fig.update_layout(
-        xaxis_title="Actual Weight (kg)",
-        yaxis_title="Billed Weight (kg)",
-        margin=dict(t=60, b=40, l=60, r=40),
-        coloraxis_colorbar_title="Difference",
+        diff = np.abs(df["weight_diff"].to_numpy(dtype=np.float64))
+        order = np.argsort(np.nan_to_num(diff, nan=-1.0), kind="stable")
+        df = df.take(np.sort(order[-SCATTER_EXTREME_POINTS:]))
+
+    # Diagonal line (y=x) spans all packages
+    max_val = max(
+        weight_detail_df["actual_weight"].max(),
+        weight_detail_df["billed_weight"].max(),
+    )
+
+    return go.Figure(
+        [
+            *traces,
+            go.Scatter(
+                x=df["actual_weight"].to_numpy(),
+                y=df["billed_weight"].to_numpy(),
+                mode="markers",
+                marker=dict(
+                    color=df["weight_diff"].to_numpy(),
+                    coloraxis="coloraxis",
+                    opacity=0.6,
+                ),
+                customdata=df["tracking_number"].to_numpy(),
+                hovertemplate=(
+                    "actual_weight=%{x}<br>"
+                    "billed_weight=%{y}<br>"
+                    "tracking_number=%{customdata}<br>"
+                    "weight_diff=%{marker.color}<extra></extra>"
+                ),
+                showlegend=False,
+            ),
+            go.Scatter(
+                x=[0, max_val],
+                y=[0, max_val],
+                mode="lines",
+                name="Equal Weight Line",
+                line=dict(color="gray", dash="dash"),
+            ),
+        ],
+        layout=dict(
+            title="Actual vs Billed Weight",
+            coloraxis_colorscale="RdYlGn_r",
+            xaxis_title="Actual Weight (kg)",
+            yaxis_title="Billed Weight (kg)",
+            margin=dict(t=60, b=40, l=60, r=40),
+            coloraxis_colorbar_title="Difference",
+        ),
     )
 
-    return fig
-
 
 def create_service_comparison(
     by_service_df: pd.DataFrame, currency: str = "EUR"
@@ -374,57 +406,54 @@ def create_service_comparison(
     if by_service_df.empty:
         return _empty_chart("No service data available")
 
-    fig = go.Figure()
-
-    fig.add_trace(
-        go.Bar(
-            x=by_service_df["service_name"],
-            y=by_service_df["total_cost"],
-            name="Total Cost",
-            marker_color=COLORS["primary"],
-            yaxis="y",
-            offsetgroup=1,
-            hovertemplate=f"<b>%{{x}}</b><br>Total Cost: %{{y:,.2f}} {currency}<extra></extra>",
-        )
-    )
-
-    fig.add_trace(
-        go.Bar(
-            x=by_service_df["service_name"],
-            y=by_service_df["avg_cost_per_package"],
-            name="Avg Cost/Package",
-            marker_color=COLORS["secondary"],
-            yaxis="y2",
-            offsetgroup=2,
-            hovertemplate=f"<b>%{{x}}</b><br>Avg Cost: %{{y:,.2f}} {currency}<extra></extra>",
-        )
-    )
-
-    fig.update_layout(
-        title="Service Type Comparison",
-        xaxis_title="",
-        yaxis=dict(
-            title=dict(
-                text=f"Total Cost ({currency})",
-                font=dict(color=COLORS["primary"]),
+    services = by_service_df["service_name"].to_numpy()
+    return go.Figure(
+        [
+            go.Bar(
+                x=services,
+                y=by_service_df["total_cost"].to_numpy(),
+                name="Total Cost",
+                marker_color=COLORS["primary"],
+                yaxis="y",
+                offsetgroup=1,
+                hovertemplate=f"<b>%{{x}}</b><br>Total Cost: %{{y:,.2f}} {currency}<extra></extra>",
             ),
-        ),
-        yaxis2=dict(
-            title=dict(
-                text=f"Avg Cost per Package ({currency})",
-                font=dict(color=COLORS["secondary"]),
+            go.Bar(
+                x=services,
+                y=by_service_df["avg_cost_per_package"].to_numpy(),
+                name="Avg Cost/Package",
+                marker_color=COLORS["secondary"],
+                yaxis="y2",
+                offsetgroup=2,
+                hovertemplate=f"<b>%{{x}}</b><br>Avg Cost: %{{y:,.2f}} {currency}<extra></extra>",
+            ),
+        ],
+        layout=dict(
+            title="Service Type Comparison",
+            xaxis_title="",
+            yaxis=dict(
+                title=dict(
+                    text=f"Total Cost ({currency})",
+                    font=dict(color=COLORS["primary"]),
+                ),
+            ),
+            yaxis2=dict(
+                title=dict(
+                    text=f"Avg Cost per Package ({currency})",
+                    font=dict(color=COLORS["secondary"]),
+                ),
+                overlaying="y",
+                side="right",
             ),
-            overlaying="y",
-            side="right",
+            barmode="group",
+            legend=dict(
+                orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1
+            ),
+            xaxis_tickangle=-45,
+            margin=dict(t=80, b=100, l=60, r=60),
         ),
-        barmode="group",
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        xaxis_tickangle=-45,
-        margin=dict(t=80, b=100, l=60, r=60),
     )
 
-    return fig
-
 
 def create_duties_breakdown_pie(
     by_charge_type_df: pd.DataFrame, currency: str = "EUR"
@@ -439,29 +468,20 @@ def create_duties_breakdown_pie(
         "Government Charges": COLORS["accent"],  # Teal
     }
 
-    fig = px.pie(
-        by_charge_type_df,
-        values="total_cost",
-        names="charge_name",
-        title="Duties & Brokerage Breakdown",
-        color="charge_name",
-        color_discrete_map=colors,
-        hole=0.4,
-    )
-
-    fig.update_traces(
-        textposition="inside",
-        textinfo="percent+label",
-        hovertemplate=f"<b>%{{label}}</b><br>Amount: %{{value:,.2f}} {currency}<br>Percentage: %{{percent}}<extra></extra>",
-    )
-
-    fig.update_layout(
-        legend=dict(orientation="h", yanchor="bottom", y=-0.2),
-        margin=dict(t=60, b=80, l=20, r=20),
+    names = by_charge_type_df["charge_name"].to_numpy()
+    return go.Figure(
+        go.Pie(
+            labels=names,
+            values=by_charge_type_df["total_cost"].to_numpy(),
+            marker_colors=_discrete_colors(names, colors),
+            hole=0.4,
+            textposition="inside",
+            textinfo="percent+label",
+            hovertemplate=f"<b>%{{label}}</b><br>Amount: %{{value:,.2f}} {currency}<br>Percentage: %{{percent}}<extra></extra>",
+        ),
+        layout=dict(title="Duties & Brokerage Breakdown", **PIE_LAYOUT),
     )
 
-    return fig
-
 
 def create_duties_by_country_bar(
     by_country_df: pd.DataFrame, top_n: int = 15, currency: str = "EUR"
@@ -470,36 +490,30 @@ def create_duties_by_country_bar(
     if by_country_df.empty:
         return _empty_chart("No country data available")
 
-    top_countries = by_country_df.head(top_n)
-
-    fig = go.Figure()
+    top_countries = by_country_df.nlargest(top_n, "total_cost")
 
-    fig.add_trace(
+    return go.Figure(
         go.Bar(
-            x=top_countries["country_name"],
-            y=top_countries["total_cost"],
+            x=top_countries["country_name"].to_numpy(),
+            y=top_countries["total_cost"].to_numpy(),
             name="Total Cost",
             marker_color=COLORS["accent"],
-            text=top_countries["shipment_count"].apply(lambda x: f"{x} shipments"),
+            text=top_countries["shipment_count"].to_numpy(),
+            texttemplate="%{text} shipments",
             textposition="outside",
             hovertemplate=(
                 "<b>%{x}</b><br>"
                 f"Import Costs: %{{y:,.2f}} {currency}<br>"
-                "%{text}<extra></extra>"
+                "Shipments: %{text}<extra></extra>"
             ),
-        )
-    )
-
-    fig.update_layout(
-        title=f"Import Costs by Destination Country (Top {top_n})",
-        xaxis_title="",
-        yaxis_title=f"Total Import Costs ({currency})",
-        xaxis_tickangle=-45,
-        margin=dict(t=60, b=100, l=60, r=20),
+        ),
+        layout=dict(
+            title=f"Import Costs by Destination Country (Top {top_n})",
+            yaxis_title=f"Total Import Costs ({currency})",
+            **COUNTRY_BAR_LAYOUT,
+        ),
     )
 
-    return fig
-
 
 def create_accessorials_bar(
     by_charge_code_df: pd.DataFrame, top_n: int = 15, currency: str = "EUR"
@@ -508,41 +522,39 @@ def create_accessorials_bar(
     if by_charge_code_df.empty:
         return _empty_chart("No accessorial data available")
 
-    top_charges = by_charge_code_df.head(top_n)
+    top_charges = by_charge_code_df.nlargest(top_n, "total_cost")
 
     # Create label with code and description
     top_charges = top_charges.copy()
     top_charges["label"] = (
-        top_charges["charge_code"] + " - " + top_charges["description"].str[:30]
-    )
-
-    fig = px.bar(
-        top_charges,
-        y="label",
-        x="total_cost",
-        orientation="h",
-        title=f"Accessorial Charges by Type (Top {top_n})",
-        color="total_cost",
-        color_continuous_scale="YlOrBr",
-        text="shipment_count",
+        top_charges["charge_code"].astype(str)
+        + " - "
+        + top_charges["description"].str[:30]
     )
 
-    fig.update_traces(
-        texttemplate="%{text} shipments",
-        textposition="outside",
-        hovertemplate=f"<b>%{{y}}</b><br>Cost: %{{x:,.2f}} {currency}<br>Shipments: %{{text}}<extra></extra>",
-    )
-
-    fig.update_layout(
-        xaxis_title=f"Total Cost ({currency})",
-        yaxis_title="",
-        yaxis=dict(autorange="reversed"),
-        margin=dict(t=60, b=40, l=200, r=60),
-        coloraxis_showscale=False,
+    costs = top_charges["total_cost"].to_numpy()
+    return go.Figure(
+        go.Bar(
+            y=top_charges["label"].to_numpy(),
+            x=costs,
+            orientation="h",
+            marker=dict(color=costs, coloraxis="coloraxis"),
+            text=top_charges["shipment_count"].to_numpy(),
+            texttemplate="%{text} shipments",
+            textposition="outside",
+            hovertemplate=f"<b>%{{y}}</b><br>Cost: %{{x:,.2f}} {currency}<br>Shipments: %{{text}}<extra></extra>",
+        ),
+        layout=dict(
+            title=f"Accessorial Charges by Type (Top {top_n})",
+            coloraxis_colorscale="YlOrBr",
+            xaxis_title=f"Total Cost ({currency})",
+            yaxis_title="",
+            yaxis=dict(autorange="reversed"),
+            margin=dict(t=60, b=40, l=200, r=60),
+            coloraxis_showscale=False,
+        ),
     )
 
-    return fig
-
 
 def create_accessorials_by_country_bar(
     by_country_df: pd.DataFrame, top_n: int = 15, currency: str = "EUR"
@@ -551,36 +563,30 @@ def create_accessorials_by_country_bar(
     if by_country_df.empty:
         return _empty_chart("No country data available")
 
-    top_countries = by_country_df.head(top_n)
-
-    fig = go.Figure()
+    top_countries = by_country_df.nlargest(top_n, "total_cost")
 
-    fig.add_trace(
+    return go.Figure(
         go.Bar(
-            x=top_countries["country_name"],
-            y=top_countries["total_cost"],
+            x=top_countries["country_name"].to_numpy(),
+            y=top_countries["total_cost"].to_numpy(),
             name="Total Cost",
             marker_color=COLORS["accessorial"],
-            text=top_countries["shipment_count"].apply(lambda x: f"{x} shipments"),
+            text=top_countries["shipment_count"].to_numpy(),
+            texttemplate="%{text} shipments",
             textposition="outside",
             hovertemplate=(
                 "<b>%{x}</b><br>"
                 f"Accessorial Costs: %{{y:,.2f}} {currency}<br>"
-                "%{text}<extra></extra>"
+                "Shipments: %{text}<extra></extra>"
             ),
-        )
-    )
-
-    fig.update_layout(
-        title=f"Accessorial Costs by Destination (Top {top_n})",
-        xaxis_title="",
-        yaxis_title=f"Total Accessorial Costs ({currency})",
-        xaxis_tickangle=-45,
-        margin=dict(t=60, b=100, l=60, r=20),
+        ),
+        layout=dict(
+            title=f"Accessorial Costs by Destination (Top {top_n})",
+            yaxis_title=f"Total Accessorial Costs ({currency})",
+            **COUNTRY_BAR_LAYOUT,
+        ),
     )
 
-    return fig
-
 
 def create_accessorials_trend(
     trends_df: pd.DataFrame, currency: str = "EUR"
@@ -589,45 +595,35 @@ def create_accessorials_trend(
     if trends_df.empty:
         return _empty_chart("No trend data available")
 
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-
-    fig.add_trace(
-        go.Scatter(
-            x=trends_df["period"],
-            y=trends_df["total_cost"],
-            name="Total Cost",
-            line=dict(color=COLORS["accessorial"], width=3),
-            mode="lines+markers",
-            hovertemplate=f"Cost: %{{y:,.2f}} {currency}<extra></extra>",
-        ),
-        secondary_y=False,
-    )
-
-    fig.add_trace(
-        go.Scatter(
-            x=trends_df["period"],
-            y=trends_df["shipment_count"],
-            name="Shipments",
-            line=dict(color=COLORS["secondary"], width=3, dash="dash"),
-            mode="lines+markers",
-            hovertemplate="Shipments: %{y}<extra></extra>",
+    periods = trends_df["period"].to_numpy()
+    return go.Figure(
+        [
+            go.Scatter(
+                x=periods,
+                y=trends_df["total_cost"].to_numpy(),
+                name="Total Cost",
+                line=dict(color=COLORS["accessorial"], width=3),
+                mode="lines+markers",
+                hovertemplate=f"Cost: %{{y:,.2f}} {currency}<extra></extra>",
+            ),
+            go.Scatter(
+                x=periods,
+                y=trends_df["shipment_count"].to_numpy(),
+                name="Shipments",
+                line=dict(color=COLORS["secondary"], width=3, dash="dash"),
+                mode="lines+markers",
+                hovertemplate="Shipments: %{y}<extra></extra>",
+                yaxis="y2",
+            ),
+        ],
+        layout=dict(
+            title="Accessorial Costs Over Time",
+            yaxis_title=f"Total Cost ({currency})",
+            yaxis2=dict(title="Shipment Count", overlaying="y", side="right"),
+            **TREND_LAYOUT,
         ),
-        secondary_y=True,
     )
 
-    fig.update_layout(
-        title="Accessorial Costs Over Time",
-        xaxis_title="Period",
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
-        margin=dict(t=80, b=40, l=60, r=60),
-        hovermode="x unified",
-    )
-
-    fig.update_yaxes(title_text=f"Total Cost ({currency})", secondary_y=False)
-    fig.update_yaxes(title_text="Shipment Count", secondary_y=True)
-
-    return fig
-
 
 def create_kpi_cards(summary) -> dict:
     """Create KPI card data from summary.
@@ -650,23 +646,37 @@ def create_kpi_cards(summary) -> dict:
     }
 
 
+def _discrete_colors(names, color_map: dict[str, str]) -> list[str]:
+    """Color per category, assigning unmapped ones from DEFAULT_SEQUENCE.
+
+    Matches how Plotly Express applies ``color_discrete_map``.
+    """
+    mapping = dict(color_map)
+    for name in names:
+        if mapping.get(name) is None:
+            mapping[name] = DEFAULT_SEQUENCE[len(mapping) % len(DEFAULT_SEQUENCE)]
+    return [mapping[name] for name in names]
+
+
 def _empty_chart(message: str) -> go.Figure:
     """Create empty chart with message."""
-    fig = go.Figure()
-    fig.add_annotation(
-        text=message,
-        xref="paper",
-        yref="paper",
-        x=0.5,
-        y=0.5,
-        showarrow=False,
-        font=dict(size=16, color="gray"),
-    )
-    fig.update_layout(
-        xaxis=dict(visible=False),
-        yaxis=dict(visible=False),
+    return go.Figure(
+        layout=dict(
+            annotations=[
+                dict(
+                    text=message,
+                    xref="paper",
+                    yref="paper",
+                    x=0.5,
+                    y=0.5,
+                    showarrow=False,
+                    font=dict(size=16, color="gray"),
+                )
+            ],
+            xaxis=dict(visible=False),
+            yaxis=dict(visible=False),
+        )
     )
-    return fig
 
 
 def create_visualizations(analyzer) -> dict:
@@ -681,27 +691,22 @@ def create_visualizations(analyzer) -> dict:
     summary = analyzer.get_summary()
     currency = summary.currency
 
+    # Run each analysis once; several charts are drawn from the same result
+    breakdown = analyzer.analyze_cost_breakdown()
+    by_country = analyzer.analyze_by_destination()
+    weights = analyzer.analyze_weights()
+
     return {
-        "cost_breakdown_pie": create_cost_breakdown_pie(
-            analyzer.analyze_cost_breakdown()
-        ),
-        "cost_breakdown_bar": create_cost_breakdown_bar(
-            analyzer.analyze_cost_breakdown(), currency
-        ),
-        "destination_map": create_destination_map(analyzer.analyze_by_destination()),
-        "destination_bar": create_destination_bar(
-            analyzer.analyze_by_destination(), currency=currency
-        ),
+        "cost_breakdown_pie": create_cost_breakdown_pie(breakdown),
+        "cost_breakdown_bar": create_cost_breakdown_bar(breakdown, currency),
+        "destination_map": create_destination_map(by_country),
+        "destination_bar": create_destination_bar(by_country, currency=currency),
         "trend_chart": create_trend_chart(analyzer.analyze_trends(), currency),
         "return_reasons": create_return_reasons_chart(
             analyzer.analyze_returns()["by_reason"]
         ),
-        "weight_distribution": create_weight_distribution(
-            analyzer.analyze_weights()["distribution"]
-        ),
-        "weight_scatter": create_weight_scatter(
-            analyzer.analyze_weights().get("detail", pd.DataFrame())
-        ),
+        "weight_distribution": create_weight_distribution(weights["distribution"]),
+        "weight_scatter": create_weight_scatter(weights.get("detail", pd.DataFrame())),
         "service_comparison": create_service_comparison(
             analyzer.analyze_services(), currency
         ),
@@ -0,0 +1,94 @@
+"""Shared fixtures: small UPS Billing Data CSVs built in memory."""
+
+import csv
+import io
+
+import pytest
+
+from src.parser import COLUMN_MAPPING
+
+# Exports are wider than the mapped columns; the last one read is col175
+WIDTH = max(COLUMN_MAPPING.values()) + 1
+
+
+def invoice_row(**fields) -> list[str]:
+    """One CSV row with the named COLUMN_MAPPING fields filled in."""
+    row = [""] * WIDTH
+    for name, value in fields.items():
+        row[COLUMN_MAPPING[name]] = str(value)
+    return row
+
+
+def package_rows(
+    tracking: str,
+    date: str,
+    country: str,
+    net: float,
+    service: tuple[str, str] = ("004", "TB Standard"),
+    city: str = "Berlin",
+    actual_weight: float = 2.5,
+    billed_weight: float = 3.0,
+    **fields,
+) -> list[list[str]]:
+    """A freight row plus a fuel surcharge row for one package."""
+    code, description = service
+    common = {
+        "version": "2.1",
+        "account_number": "0000AB",
+        "currency": "EUR",
+        "invoice_number": "INV1",
+        "invoice_date": "2024-01-10",
+        "shipment_date": date,
+        "tracking_number": tracking,
+        "service_code": code,
+        "sender_country": "DE",
+        "recipient_country": country,
+        "recipient_city": city,
+        **fields,
+    }
+    return [
+        invoice_row(
+            **common,
+            package_indicator="1",
+            charge_category="FRT",
+            charge_code="011",
+            charge_description=description,
+            actual_weight=actual_weight,
+            billed_weight=billed_weight,
+            discount_amount="1.50",
+            net_amount=f"{net:.2f}",
+        ),
+        invoice_row(
+            **common,
+            package_indicator="0",
+            charge_category="FSC",
+            charge_code="FSC",
+            charge_description="Fuel Surcharge",
+            net_amount="0.75",
+        ),
+    ]
+
+
+def to_csv(rows: list[list[str]], encoding: str = "utf-8") -> bytes:
+    """Serialize rows the way UPS exports them: no header, comma-separated."""
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\r\n").writerows(rows)
+    return buffer.getvalue().encode(encoding)
+
+
+@pytest.fixture
+def invoice_rows() -> list[list[str]]:
+    """Four packages across a year boundary, one of them a return."""
+    return [
+        *package_rows("1Z001", "2023-12-29", "FR", 10.00),
+        *package_rows("1Z002", "2023-12-31", "DE", 12.50),
+        *package_rows("1Z003", "2024-01-01", "CH", 20.00, city="Zürich"),
+        *package_rows(
+            "1Z004",
+            "2024-01-15",
+            "FR",
+            8.25,
+            service=("353", "TB Standard Undeliverable Return"),
+            shipment_type="RTN",
+        ),
+    ]
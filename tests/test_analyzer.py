@@ -0,0 +1,211 @@
+"""Tests for InvoiceAnalyzer, checked against the plain pandas versions."""
+
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from conftest import package_rows, to_csv
+from src.analyzer import InvoiceAnalyzer
+from src.parser import UPSInvoiceParser, combine_invoices
+
+
+def parse(rows: list[list[str]]) -> pd.DataFrame:
+    return UPSInvoiceParser().parse_file(io.BytesIO(to_csv(rows)), "invoice.csv")
+
+
+def dated_rows(dates: list[str], **kwargs) -> list[list[str]]:
+    """One package per date, cycling through countries, services and costs."""
+    countries = ["DE", "FR", "CH", "US"]
+    services = [("004", "TB Standard"), ("007", "WW Express Saver")]
+    rows = []
+    for i, date in enumerate(dates):
+        rows += package_rows(
+            f"1Z{i:04d}",
+            date,
+            countries[i % len(countries)],
+            10.0 + i % 7,
+            service=services[i % len(services)],
+            shipment_type="RTN" if i % 5 == 0 else "",
+            **kwargs,
+        )
+    return rows
+
+
+# Top expenses
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("n", [0, 1, 3, 10, 40, 60])
+def test_top_positions_match_nlargest(seed, n):
+    rng = np.random.default_rng(seed)
+    # Few distinct values, so there are many ties, plus missing values
+    values = pd.Series(rng.integers(0, 8, 50).astype(float))
+    values[rng.random(50) < 0.2] = np.nan
+
+    positions = InvoiceAnalyzer._top_positions(values, n)
+
+    # Ties in position order, missing values last
+    expected = values.sort_values(ascending=False, kind="stable").index[:n]
+    np.testing.assert_array_equal(positions, expected)
+    if n < len(values):
+        # pandas 2 sorts unstably once n covers the whole series
+        largest = values.nlargest(n, keep="first").index
+        np.testing.assert_array_equal(positions, largest)
+
+
+def test_get_top_expenses_matches_nlargest():
+    analyzer = InvoiceAnalyzer(parse(dated_rows(["2024-01-02"] * 12)))
+
+    top = analyzer.get_top_expenses(n=5)
+
+    expected = analyzer.packages.nlargest(5, "total_charge")[top.columns]
+    pd.testing.assert_frame_equal(top, expected)
+
+
+# Trends
+
+
+def test_week_periods_match_strftime():
+    # Every day around several year boundaries, including years where
+    # 1 January is in week 0 and ones where it starts week 1
+    dates = [
+        str(day.date())
+        for year in range(2020, 2027)
+        for day in pd.date_range(f"{year - 1}-12-24", f"{year}-01-10")
+    ]
+    analyzer = InvoiceAnalyzer(parse(dated_rows(dates)))
+
+    weeks = analyzer.analyze_trend_periods()["week"]
+
+    packages = analyzer.packages.dropna(subset=["shipment_date"])
+    expected = (
+        packages.groupby(packages["shipment_date"].dt.strftime("%Y-W%W"))
+        .agg(
+            package_count=("tracking_number", "count"),
+            total_cost=("total_charge", "sum"),
+        )
+        .sort_index()
+    )
+    assert weeks["period"].tolist() == expected.index.tolist()
+    assert weeks["package_count"].tolist() == expected["package_count"].tolist()
+    np.testing.assert_allclose(weeks["total_cost"], expected["total_cost"])
+
+
+# Weights
+
+
+def test_weight_buckets_match_pd_cut():
+    # Bucket edges, values just past them, zero and very heavy packages
+    weights = [0, 0.1, 0.5, 0.51, 1, 1.5, 2, 5, 5.01, 10, 20, 49.9, 50, 51, 500]
+    rows = []
+    for i, weight in enumerate(weights):
+        rows += package_rows(
+            f"1Z{i:04d}", "2024-01-02", "DE", 5.0 + i, billed_weight=weight
+        )
+    analyzer = InvoiceAnalyzer(parse(rows))
+
+    distribution = analyzer.analyze_weights()["distribution"]
+
+    packages = analyzer.packages
+    weight_data = packages[
+        (packages["billed_weight"] > 0) | (packages["actual_weight"] > 0)
+    ]
+    bins = [0, 0.5, 1, 2, 5, 10, 20, 50, float("inf")]
+    labels = ["0-0.5kg", "0.5-1kg", "1-2kg", "2-5kg"]
+    labels += ["5-10kg", "10-20kg", "20-50kg", "50kg+"]
+    buckets = pd.cut(weight_data["billed_weight"], bins=bins, labels=labels)
+    expected = (
+        weight_data.groupby(buckets, observed=True)
+        .agg(
+            package_count=("tracking_number", "count"),
+            total_cost=("total_charge", "sum"),
+        )
+        .reset_index()
+    )
+    assert distribution["weight_range"].tolist() == expected["billed_weight"].tolist()
+    assert distribution["package_count"].tolist() == expected["package_count"].tolist()
+    np.testing.assert_allclose(distribution["total_cost"], expected["total_cost"])
+
+
+# Filters
+
+
+def baseline_filter(
+    data: pd.DataFrame,
+    start_date=None,
+    end_date=None,
+    countries=None,
+    services=None,
+    returns_only=False,
+) -> pd.DataFrame:
+    """The original filter_data: one boolean selection per condition."""
+    if start_date:
+        data = data[data["shipment_date"] >= start_date]
+    if end_date:
+        data = data[data["shipment_date"] <= end_date]
+    if countries:
+        data = data[data["recipient_country"].isin(countries)]
+    if services:
+        data = data[data["service_code"].isin(services)]
+    if returns_only:
+        data = data[data["is_return"] == True]  # noqa: E712
+    return data
+
+
+@pytest.fixture(params=["sorted", "unsorted"])
+def filter_data(request) -> pd.DataFrame:
+    """Dated and undated rows, sorted by combine_invoices or in file order."""
+    dates = ["2024-02-10", "2024-01-05", "", "2024-01-20", "2024-03-01"]
+    dates += ["2024-01-05", "2024-02-29", "", "2024-01-31", "2024-02-01"]
+    data = parse(dated_rows(dates))
+    if request.param == "sorted":
+        data = combine_invoices([data])
+    return data
+
+
+@pytest.mark.parametrize(
+    "filters",
+    [
+        {},
+        {"start_date": "2024-01-20"},
+        {"end_date": "2024-02-01"},
+        {"start_date": "2024-01-05", "end_date": "2024-01-05"},
+        {"start_date": "2024-01-06", "end_date": "2024-01-19"},
+        {"start_date": "2023-01-01", "end_date": "2025-01-01"},
+        {"start_date": "2024-03-02"},
+        {"countries": ["FR", "CH"]},
+        {"countries": ["XX"]},
+        {"countries": []},
+        {"services": ["007"]},
+        {"services": ["007", "999"]},
+        {"returns_only": True},
+        {
+            "start_date": "2024-01-10",
+            "end_date": "2024-02-29",
+            "countries": ["DE", "FR", "US"],
+            "services": ["004"],
+        },
+    ],
+)
+def test_filter_data_matches_boolean_selection(filter_data, filters):
+    analyzer = InvoiceAnalyzer(filter_data)
+
+    filtered = analyzer.filter_data(**filters)
+
+    expected = baseline_filter(filter_data, **filters)
+    pd.testing.assert_frame_equal(filtered.data, expected)
+    dates = expected["shipment_date"].dropna()
+    assert filtered.date_min == (dates.min() if len(dates) else None)
+    assert filtered.date_max == (dates.max() if len(dates) else None)
+
+
+@pytest.mark.parametrize("values", [[], ["DE"], ["DE", "XX"], ["XX"]])
+def test_isin_matches_pandas(values):
+    codes = pd.Series(["DE", "FR", None, "DE", "CH"])
+
+    for column in (codes, codes.astype("category")):
+        np.testing.assert_array_equal(
+            InvoiceAnalyzer._isin(column, values), codes.isin(values).to_numpy()
+        )
@@ -0,0 +1,308 @@
+"""Tests for the UPS Billing Data parser."""
+
+import codecs
+import io
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.api import types
+
+from conftest import to_csv
+from src.parser import (
+    CATEGORY_COLUMNS,
+    COLUMN_MAPPING,
+    SNIFF_BYTES,
+    InvoiceCache,
+    UPSInvoiceParser,
+    _concat_frames,
+    _ShortRowsError,
+    _sniff_encoding,
+    load_invoices_from_folder,
+)
+
+DERIVED_COLUMNS = [
+    "total_charge",
+    "service_name",
+    "charge_category_name",
+    "is_package_line",
+    "is_return",
+    "weight_difference",
+    "shipment_week",
+    "shipment_month",
+    "shipment_year_month",
+]
+
+
+def parse(data: bytes, filename: str = "invoice.csv") -> pd.DataFrame:
+    return UPSInvoiceParser().parse_file(io.BytesIO(data), filename)
+
+
+def test_parsed_columns_and_dtypes(invoice_rows):
+    df = parse(to_csv(invoice_rows))
+
+    assert list(df.columns) == [*COLUMN_MAPPING, "source_file", *DERIVED_COLUMNS]
+    for col in ["tracking_number", "service_code", "recipient_country"]:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+    for col in ["invoice_date", "shipment_date", "pickup_date", "delivery_date"]:
+        assert types.is_datetime64_dtype(df[col]), col
+    for col in ["net_amount", "discount_amount", "total_charge", "actual_weight"]:
+        assert df[col].dtype == np.float64, col
+    for col in ["recipient_city", "charge_description", "service_name"]:
+        assert types.is_string_dtype(df[col]), col
+    assert df["is_return"].dtype == bool
+    assert df["shipment_week"].dtype == "UInt32"
+
+
+def test_shipment_month_columns(invoice_rows):
+    df = parse(to_csv(invoice_rows))
+
+    months = ["2023-12"] * 4 + ["2024-01"] * 4
+    for col in ["shipment_month", "shipment_year_month"]:
+        assert isinstance(df[col].dtype, pd.CategoricalDtype), col
+        assert df[col].astype(str).tolist() == months
+
+
+# Readers
+
+
+def baseline_read(data: bytes, encoding: str = "utf-8") -> pd.DataFrame:
+    """The original reader: pandas' C parser over the whole file."""
+    text = data.decode(encoding)
+    return pd.read_csv(io.StringIO(text), header=None, dtype=str, on_bad_lines="skip")
+
+
+def mapped(df: pd.DataFrame) -> pd.DataFrame:
+    """Mapped columns as object strings with None for missing values."""
+    columns = sorted(set(COLUMN_MAPPING.values()))
+    out = df.reindex(columns=columns).astype(object)
+    return out.where(out.notna(), None).reset_index(drop=True)
+
+
+def test_readers_match_baseline(invoice_rows):
+    data = to_csv(invoice_rows)
+    parser = UPSInvoiceParser()
+    expected = mapped(baseline_read(data))
+
+    pd.testing.assert_frame_equal(
+        mapped(parser._read_csv_pyarrow(io.BytesIO(data))), expected
+    )
+    pd.testing.assert_frame_equal(
+        mapped(parser._read_csv_pandas(io.BytesIO(data))), expected
+    )
+
+
+def test_short_rows_fall_back_to_pandas(invoice_rows):
+    # A row cut off after the charge columns; pandas pads it with NaN
+    rows = [*invoice_rows, invoice_rows[0][: COLUMN_MAPPING["net_amount"] + 1]]
+    data = to_csv(rows)
+
+    with pytest.raises(_ShortRowsError):
+        UPSInvoiceParser()._read_csv_pyarrow(io.BytesIO(data))
+
+    expected = mapped(baseline_read(data))
+    pd.testing.assert_frame_equal(
+        mapped(UPSInvoiceParser()._read_csv_file(io.BytesIO(data))), expected
+    )
+    net = pd.to_numeric(expected[COLUMN_MAPPING["net_amount"]]).sum()
+    df = parse(data)
+    assert len(df) == len(rows)
+    assert df["net_amount"].sum() == pytest.approx(net)
+
+    # The str path of uploads takes the same fallback
+    parser = UPSInvoiceParser()
+    df = parser.parse_csv_content(data.decode("utf-8"))
+    assert parser.raw_shape[0] == len(rows)
+    assert df["net_amount"].sum() == pytest.approx(net)
+
+
+def test_long_rows_are_skipped(invoice_rows):
+    rows = [*invoice_rows, [*invoice_rows[0], "extra"]]
+    data = to_csv(rows)
+
+    df = parse(data)
+    assert len(df) == len(invoice_rows)
+    pd.testing.assert_frame_equal(
+        mapped(UPSInvoiceParser()._read_csv_file(io.BytesIO(data))),
+        mapped(baseline_read(data)),
+    )
+
+
+@pytest.mark.parametrize(
+    ("encoding", "expected"),
+    [
+        ("utf-8", "utf-8"),
+        ("utf-8-sig", "utf-8-sig"),
+        ("latin-1", "latin-1"),
+    ],
+)
+def test_encodings(invoice_rows, encoding, expected):
+    data = to_csv(invoice_rows, encoding=encoding)
+    assert _sniff_encoding(data[:SNIFF_BYTES]) == expected
+
+    df = parse(data)
+    assert df["version"].iloc[0] == "2.1"
+    assert "Zürich" in df["recipient_city"].tolist()
+
+
+def test_latin1_after_sniffed_sample(invoice_rows):
+    # The sample is plain ASCII; the first latin-1 byte comes later
+    ascii_rows = [row for row in invoice_rows if "Zürich" not in row]
+    filler = ascii_rows * (SNIFF_BYTES // len(to_csv(ascii_rows)) + 1)
+    data = to_csv([*filler, *invoice_rows], encoding="latin-1")
+    assert _sniff_encoding(data[:SNIFF_BYTES]) == "utf-8"
+
+    df = parse(data)
+    assert len(df) == len(filler) + len(invoice_rows)
+    assert "Zürich" in df["recipient_city"].tolist()
+
+
+def test_sniff_encoding_cut_character():
+    # A multi-byte character split by the sample boundary is still UTF-8
+    assert _sniff_encoding("abcü".encode("utf-8")[:-1]) == "utf-8"
+    assert _sniff_encoding(codecs.BOM_UTF16_LE + "a".encode("utf-16-le")) == "utf-16"
+
+
+# Cache
+
+
+@pytest.fixture
+def invoice_folder(tmp_path, invoice_rows):
+    (tmp_path / "a.csv").write_bytes(to_csv(invoice_rows[:4]))
+    (tmp_path / "b.csv").write_bytes(to_csv(invoice_rows[4:]))
+    return tmp_path
+
+
+@pytest.fixture
+def parse_calls(monkeypatch):
+    """Count CSV parses, i.e. cache misses."""
+    calls = []
+    parse_file = UPSInvoiceParser.parse_file
+
+    def counting_parse_file(self, file, filename="uploaded"):
+        calls.append(filename)
+        return parse_file(self, file, filename)
+
+    monkeypatch.setattr(UPSInvoiceParser, "parse_file", counting_parse_file)
+    return calls
+
+
+def dtype_kind(series: pd.Series) -> str:
+    for kind, check in [
+        ("category", lambda s: isinstance(s.dtype, pd.CategoricalDtype)),
+        ("datetime", types.is_datetime64_dtype),
+        ("bool", types.is_bool_dtype),
+        ("number", types.is_numeric_dtype),
+        ("string", types.is_string_dtype),
+    ]:
+        if check(series):
+            return kind
+    return str(series.dtype)
+
+
+def assert_same_data(actual: pd.DataFrame, expected: pd.DataFrame):
+    """Compare values and dtype kinds.
+
+    A parquet round trip may change string storage, the dtype of category
+    labels and the datetime resolution of empty columns.
+    """
+    assert actual.columns.equals(expected.columns)
+    for col in expected.columns:
+        assert dtype_kind(actual[col]) == dtype_kind(expected[col]), col
+    pd.testing.assert_frame_equal(
+        actual.astype(object), expected.astype(object), check_dtype=False
+    )
+
+
+def test_cache_round_trip(invoice_folder, parse_calls):
+    csv_path = invoice_folder / "a.csv"
+    expected = parse(csv_path.read_bytes(), "a.csv")
+    parse_calls.clear()
+
+    cache = InvoiceCache(invoice_folder)
+    first = cache.load(csv_path)
+    cache.save()
+    second = InvoiceCache(invoice_folder).load(csv_path)
+
+    assert parse_calls == ["a.csv"]
+    pd.testing.assert_frame_equal(first, expected)
+    assert_same_data(second, expected)
+    # Missing strings come back as NaN, not pd.NA (pandas 2 reads pd.NA)
+    assert all(value is not pd.NA for value in second["sender_name"])
+
+
+def test_cache_invalidation(invoice_folder, parse_calls, monkeypatch):
+    csv_path = invoice_folder / "a.csv"
+    cache = InvoiceCache(invoice_folder)
+    cache.load(csv_path)
+    cache.save()
+    entries = set(cache.cache_dir.glob("*.parquet"))
+
+    # A touched file has a new mtime
+    stat = csv_path.stat()
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    InvoiceCache(invoice_folder).load(csv_path)
+    # An edited file keeps its mtime but changes size
+    stat = csv_path.stat()
+    csv_path.write_bytes(csv_path.read_bytes() + b"\r\n")
+    os.utime(csv_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    InvoiceCache(invoice_folder).load(csv_path)
+    # A parser change bumps the version
+    monkeypatch.setattr(InvoiceCache, "VERSION", InvoiceCache.VERSION + 1)
+    cache = InvoiceCache(invoice_folder)
+    cache.load(csv_path)
+    assert parse_calls == ["a.csv"] * 4
+
+    # Entries for the old keys are evicted on save
+    cache.save()
+    remaining = set(cache.cache_dir.glob("*.parquet"))
+    assert len(remaining) == 1
+    assert not remaining & entries
+
+
+def test_load_invoices_from_folder(invoice_folder, invoice_rows):
+    df = load_invoices_from_folder(str(invoice_folder))
+
+    assert len(df) == len(invoice_rows)
+    assert df["shipment_date"].is_monotonic_increasing
+    assert df["source_file"].cat.categories.tolist() == ["a.csv", "b.csv"]
+
+
+# Combining
+
+
+def test_concat_frames_unions_categories(invoice_rows):
+    first = parse(to_csv(invoice_rows[:4]), "a.csv")
+    second = parse(to_csv(invoice_rows[4:]), "b.csv")
+
+    combined = _concat_frames([first, second])
+
+    reference = pd.concat(
+        [first.astype(object), second.astype(object)], ignore_index=True
+    )
+    assert combined.columns.equals(first.columns)
+    for col in CATEGORY_COLUMNS:
+        assert isinstance(combined[col].dtype, pd.CategoricalDtype), col
+        categories = combined[col].cat.categories
+        assert categories.is_monotonic_increasing, col
+        assert combined[col].astype(object).equals(reference[col]), col
+    assert combined["recipient_country"].cat.categories.tolist() == ["CH", "DE", "FR"]
+    pd.testing.assert_series_equal(
+        combined["net_amount"], reference["net_amount"].astype(float)
+    )
+
+
+def test_parse_multiple_files_matches_single_parses(invoice_rows):
+    files = [
+        (io.BytesIO(to_csv(invoice_rows[:4])), "a.csv"),
+        (io.BytesIO(to_csv(invoice_rows[4:])), "b.csv"),
+    ]
+
+    combined = UPSInvoiceParser().parse_multiple_files(files)
+
+    for file, name in files:
+        expected = parse(file.getvalue(), name)
+        actual = combined[combined["source_file"] == name].reset_index(drop=True)
+        for col in expected.columns:
+            assert actual[col].astype(object).equals(expected[col].astype(object))